@@ -4,14 +4,68 @@ RISC-V Random Instruction Generator CLI.
 """
 
 import argparse
+import copy
+import os
 import random
+import re
 import sys
 import yaml
-from typing import List, Tuple, Optional
-from riscv_rtg.isa.riscv_isa import RISCVISA, InstructionFormat, format_binary, format_hex
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Tuple, Optional, TextIO, Union
+from riscv_rtg.isa.riscv_isa import RISCVISA, InstructionFormat
 from .patterns import PatternGenerator, SemanticState, CommentGenerator
+from riscv_rtg.utils.json_cache import json_cache_file, read_json_cache, write_json_cache
 from .sequence_patterns import SequencePatternLoader, SequencePatternGenerator
 
+# Use the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# One "base:size" load/store range item, e.g. " 0x100:0x20"; the integer
+# literals are the ones int(x, 0) accepts (hex/octal/binary/decimal, with _)
+_INT_LITERAL = (r'[+-]?(?:0[xX](?:_?[0-9a-fA-F])+|0[oO](?:_?[0-7])+|0[bB](?:_?[01])+'
+                r'|[1-9](?:_?\d)*|0(?:_?0)*)')
+_RANGE_RE = re.compile(rf'\s*({_INT_LITERAL})\s*:\s*({_INT_LITERAL})\s*')
+
+# 8-bit binary strings, joined four at a time to format 32-bit words
+_BIN_TBL = [format(b, '08b') for b in range(256)]
+
+
+# 16-bit binary strings (65536 entries), built on first use for large outputs
+_BIN16: Optional[List[str]] = None
+_BIN16_MIN_COUNT = 1000
+
+
+def _bin32(word: int) -> str:
+    """Format a 32-bit word as binary (same result as format_binary(word))."""
+    return (_BIN_TBL[(word >> 24) & 0xff] + _BIN_TBL[(word >> 16) & 0xff]
+            + _BIN_TBL[(word >> 8) & 0xff] + _BIN_TBL[word & 0xff])
+
+
+def _get_bin16() -> List[str]:
+    """Return the 16-bit binary string table, building it on first call."""
+    global _BIN16
+    if _BIN16 is None:
+        _BIN16 = [format(i, '016b') for i in range(65536)]
+    return _BIN16
+
+
+def _make_bin32(count: int) -> Callable[[int], str]:
+    """Return a 32-bit binary formatter suited to formatting `count` words.
+
+    Large outputs amortize building the 16-bit table and then need only two
+    lookups per word; small ones use the 8-bit table.
+    """
+    if count < _BIN16_MIN_COUNT:
+        return _bin32
+    bin16 = _get_bin16()
+    return lambda word: bin16[word >> 16] + bin16[word & 0xffff]
+
+
+def _int_auto(x: str) -> int:
+    """argparse type for integers in decimal or prefixed (0x, 0o, 0b) form."""
+    return int(x, 0)
+
 
 def parse_load_store_ranges(ranges_spec: Optional[str]) -> Optional[List[Tuple[int, int]]]:
     """Parse load/store offset ranges specification.
@@ -30,23 +84,30 @@ def parse_load_store_ranges(ranges_spec: Optional[str]) -> Optional[List[Tuple[i
 
     ranges = []
     for part in ranges_spec.split(','):
-        part = part.strip()
-        if not part:
-            continue
-        if ':' not in part:
-            raise ValueError(f"Range '{part}' must be in format 'base:size'")
-        base_str, size_str = part.split(':', 1)
-        try:
-            base = int(base_str, 0)  # Supports hex (0x) and decimal
-            size = int(size_str, 0)
-        except ValueError as e:
-            raise ValueError(f"Invalid integer in range '{part}': {e}")
+        match = _RANGE_RE.fullmatch(part)
+        if match is None:
+            part = part.strip()
+            if not part:
+                continue
+            if ':' not in part:
+                raise ValueError(f"Range '{part}' must be in format 'base:size'")
+            raise ValueError(f"Invalid integer in range '{part}'")
+        base = int(match[1], 0)  # Supports hex (0x) and decimal
+        size = int(match[2], 0)
         if size <= 0:
-            raise ValueError(f"Range size must be positive, got size={size} in '{part}'")
+            raise ValueError(f"Range size must be positive, got size={size} in '{part.strip()}'")
         ranges.append((base, size))
     return ranges
 
 
+def load_store_ranges_arg(ranges_spec: str) -> List[Tuple[int, int]]:
+    """argparse type for --load-store-ranges; reports parse errors as usage errors."""
+    try:
+        return parse_load_store_ranges(ranges_spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def convert_load_store_ranges(value) -> Optional[List[Tuple[int, int]]]:
     """Convert load_store_ranges config value to list of tuples.
 
@@ -94,18 +155,46 @@ def convert_load_store_ranges(value) -> Optional[List[Tuple[int, int]]]:
 
 def generate_instructions(count: int, output_format: str, seed: int = None) -> List[Tuple[int, str]]:
     """Generate random instructions."""
-    if seed is not None:
-        random.seed(seed)
-
-    isa = RISCVISA()
+    isa = RISCVISA(rng=random.Random(seed))
     return isa.generate_random(count)
 
 
-def load_config(config_path: str) -> dict:
+# Parsed configs by real path: (mtime_ns, size, config), least recently used first
+_CONFIG_CACHE: "OrderedDict[str, Tuple[int, int, dict]]" = OrderedDict()
+_CONFIG_CACHE_MAX = 100
+
+
+def _read_config_file(config_path: str, st: os.stat_result):
+    """Parse a config YAML file, using a JSON cache of it when fresh.
+
+    The cache lives in the user cache directory (see json_cache_file) and
+    records the YAML's mtime_ns and size; it is used only while those still
+    match. Set RISCV_RTG_NO_CACHE=1 to always parse the YAML.
+    """
+    use_cache = not os.environ.get('RISCV_RTG_NO_CACHE')
+    if use_cache:
+        cache_file = json_cache_file(config_path)
+        config = read_json_cache(cache_file, st)
+        if config is not None:
+            return config
+
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=_YAML_LOADER)
+
+    if use_cache:
+        write_json_cache(cache_file, st, config)
+    return config
+
+
+def load_config(config_path: Union[str, TextIO]) -> dict:
     """Load YAML configuration file and return as dictionary.
 
+    Parsed configs are cached in memory while the file's mtime and size are
+    unchanged, and on disk as JSON in the user cache dir (see _read_config_file); each
+    call returns a fresh copy. Streams are parsed directly and never cached.
+
     Args:
-        config_path: Path to YAML configuration file
+        config_path: Path to YAML configuration file, or a readable text stream
 
     Returns:
         Dictionary with configuration values
@@ -114,15 +203,47 @@ def load_config(config_path: str) -> dict:
         FileNotFoundError: If config file doesn't exist
         yaml.YAMLError: If YAML syntax is invalid
     """
-    try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+    if hasattr(config_path, 'read'):
+        try:
+            config = yaml.load(config_path, Loader=_YAML_LOADER)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML syntax in {getattr(config_path, 'name', '<stream>')}: {e}")
         return config if config else {}
+
+    try:
+        st = os.stat(config_path)
+        key = os.path.realpath(config_path)
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _CONFIG_CACHE.move_to_end(key)
+            return copy.deepcopy(cached[2])
+        config = _read_config_file(config_path, st)
     except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_path}")
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML syntax in {config_path}: {e}")
 
+    config = config if config else {}
+    _CONFIG_CACHE[key] = (st.st_mtime_ns, st.st_size, config)
+    _CONFIG_CACHE.move_to_end(key)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAX:
+        _CONFIG_CACHE.popitem(last=False)
+    return copy.deepcopy(config)
+
+
+# Config fields converted like their argparse options
+_CONFIG_INT_FIELDS = frozenset(['count', 'seed', 'base_address',
+                                'load_store_offset_min', 'load_store_offset_max',
+                                'rd_min', 'rd_max', 'rs1_min', 'rs1_max', 'rs2_min', 'rs2_max'])
+_CONFIG_FLOAT_FIELDS = frozenset(['pattern_density'])
+
+
+def _config_int(value) -> int:
+    """Convert to int, handling hex strings (0x...) like argparse's _int_auto."""
+    if isinstance(value, str):
+        return int(value, 0)
+    return int(value)
+
 
 def validate_and_convert_config(config: dict) -> dict:
     """Validate config values and convert types to match argparse expectations.
@@ -138,37 +259,22 @@ def validate_and_convert_config(config: dict) -> dict:
     if not config:
         return {}
 
+    # Single pass into a fresh dict; only the nested weights are rebuilt
     validated = {}
-
-    # Helper for hex/decimal conversion matching argparse's lambda x: int(x, 0)
-    def convert_int(value):
-        """Convert to int, handling hex strings (0x...) like argparse."""
-        if isinstance(value, str):
-            return int(value, 0)
-        return int(value)
-
-    # Convert known fields
-    int_fields = ['count', 'seed', 'base_address',
-                  'load_store_offset_min', 'load_store_offset_max',
-                  'rd_min', 'rd_max', 'rs1_min', 'rs1_max', 'rs2_min', 'rs2_max']
-    float_fields = ['pattern_density']
-
     for key, value in config.items():
         if value is None:
             # Keep None values (e.g., seed: null)
             validated[key] = None
         elif key == 'weights' and isinstance(value, dict):
             # Convert nested weights dictionary
-            validated[key] = {}
-            for weight_key, weight_val in value.items():
-                if weight_val is not None:
-                    validated[key][weight_key] = float(weight_val)
-        elif key == 'load_store_ranges' and value is not None:
+            validated[key] = {weight_key: float(weight_val) for weight_key, weight_val in value.items()
+                              if weight_val is not None}
+        elif key == 'load_store_ranges':
             # Convert load/store ranges
             validated[key] = convert_load_store_ranges(value)
-        elif key in int_fields and value is not None:
-            validated[key] = convert_int(value)
-        elif key in float_fields and value is not None:
+        elif key in _CONFIG_INT_FIELDS:
+            validated[key] = _config_int(value)
+        elif key in _CONFIG_FLOAT_FIELDS:
             validated[key] = float(value)
         else:
             # Pass through other values (strings, booleans)
@@ -193,6 +299,8 @@ def merge_config_with_args(config: dict, args: argparse.Namespace, defaults: dic
         Updated argparse.Namespace with merged values
     """
     merged = argparse.Namespace(**vars(args))
+    # Work on the namespace's attribute dict directly
+    merged_dict = vars(merged)
 
     # If defaults not provided, create empty dict
     if defaults is None:
@@ -203,24 +311,62 @@ def merge_config_with_args(config: dict, args: argparse.Namespace, defaults: dic
         weights = config.pop('weights')
         for fmt, weight in weights.items():
             attr_name = f'weight_{fmt}'
-            if hasattr(merged, attr_name):
-                # Check if CLI overrode this weight (i.e., value != default)
-                current = getattr(merged, attr_name)
-                if current == defaults.get(attr_name, 1.0):
-                    setattr(merged, attr_name, weight)
+            # Check if CLI overrode this weight (i.e., value != default)
+            if attr_name in merged_dict and merged_dict[attr_name] == defaults.get(attr_name, 1.0):
+                merged_dict[attr_name] = weight
 
     # Merge other fields
     for key, value in config.items():
-        if value is not None and hasattr(merged, key):
-            # Check if CLI overrode this field (value != default)
-            current = getattr(merged, key)
-            if current == defaults.get(key):
-                setattr(merged, key, value)
+        # Check if CLI overrode this field (value != default)
+        if value is not None and key in merged_dict and merged_dict[key] == defaults.get(key):
+            merged_dict[key] = value
 
     return merged
 
 
-def main():
+def make_line_formatter(output_format: str, pc_comments: bool = False,
+                        no_hex_comments: bool = False, count: int = 0) -> Callable[[int, str, int], str]:
+    """Return a function formatting one (encoded, asm, address) as an output line.
+
+    The format options are resolved here once rather than per instruction;
+    count is the expected number of lines.
+    """
+    if output_format == "hex":
+        return lambda encoded, asm, addr: f"{encoded:08x}"
+    if output_format in ("bin", "all"):
+        bin32 = _make_bin32(count)
+    if output_format == "bin":
+        return lambda encoded, asm, addr: bin32(encoded)
+
+    # Add PC comment if requested (formats that include assembly)
+    if pc_comments:
+        def with_pc(asm: str, addr: int) -> str:
+            return f"{asm}  # 0x{addr:08x}"
+    else:
+        def with_pc(asm: str, addr: int) -> str:
+            return asm
+
+    if output_format == "asm":
+        if not pc_comments:
+            return lambda encoded, asm, addr: asm
+        return lambda encoded, asm, addr: with_pc(asm, addr)
+    if output_format == "hexasm":
+        if no_hex_comments:
+            # Old format: hex as field
+            return lambda encoded, asm, addr: f"{encoded:08x} {with_pc(asm, addr)}"
+        # New format: hex as comment
+        return lambda encoded, asm, addr: f"{with_pc(asm, addr)}  # {encoded:08x}"
+    if output_format == "all":
+        return lambda encoded, asm, addr: f"{encoded:08x} {bin32(encoded)} {with_pc(asm, addr)}"
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> Tuple[argparse.ArgumentParser, dict]:
+    """Build the argument parser and its dictionary of non-None defaults.
+
+    The parser is static, so both are built once and reused.
+    """
     parser = argparse.ArgumentParser(
         description="Generate random RISC-V instructions",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -251,7 +397,7 @@ def main():
         help="Include PC (program counter) comments in assembly output"
     )
     parser.add_argument(
-        "--base-address", type=lambda x: int(x, 0), default=0x0,
+        "--base-address", type=_int_auto, default=0x0,
         help="Base address for PC comments (default: 0x0)"
     )
     parser.add_argument(
@@ -333,40 +479,40 @@ def main():
     )
     # Address range arguments for load/store instructions
     parser.add_argument(
-        "--load-store-offset-min", type=lambda x: int(x, 0), default=-2048,
+        "--load-store-offset-min", type=_int_auto, default=-2048,
         help="Minimum offset for load/store instructions (default: -2048)"
     )
     parser.add_argument(
-        "--load-store-offset-max", type=lambda x: int(x, 0), default=2047,
+        "--load-store-offset-max", type=_int_auto, default=2047,
         help="Maximum offset for load/store instructions (default: 2047)"
     )
     parser.add_argument(
-        "--load-store-ranges", type=str, default=None,
+        "--load-store-ranges", type=load_store_ranges_arg, default=None,
         help="Comma-separated list of base:size ranges for load/store offsets (e.g., '-100:200,0x100:0x20'). Use --load-store-ranges='-100:200' or --load-store-ranges \"-100:200\" after -- separator."
     )
     # Register range arguments
     parser.add_argument(
-        "--rd-min", type=lambda x: int(x, 0), default=0,
+        "--rd-min", type=_int_auto, default=0,
         help="Minimum destination register number (0-31, default: 0)"
     )
     parser.add_argument(
-        "--rd-max", type=lambda x: int(x, 0), default=31,
+        "--rd-max", type=_int_auto, default=31,
         help="Maximum destination register number (0-31, default: 31)"
     )
     parser.add_argument(
-        "--rs1-min", type=lambda x: int(x, 0), default=0,
+        "--rs1-min", type=_int_auto, default=0,
         help="Minimum source register 1 number (0-31, default: 0)"
     )
     parser.add_argument(
-        "--rs1-max", type=lambda x: int(x, 0), default=31,
+        "--rs1-max", type=_int_auto, default=31,
         help="Maximum source register 1 number (0-31, default: 31)"
     )
     parser.add_argument(
-        "--rs2-min", type=lambda x: int(x, 0), default=0,
+        "--rs2-min", type=_int_auto, default=0,
         help="Minimum source register 2 number (0-31, default: 0)"
     )
     parser.add_argument(
-        "--rs2-max", type=lambda x: int(x, 0), default=31,
+        "--rs2-max", type=_int_auto, default=31,
         help="Maximum source register 2 number (0-31, default: 31)"
     )
     # Hexasm format arguments
@@ -375,6 +521,18 @@ def main():
         help="Disable hex as comment in hexasm format (hex appears as field)"
     )
 
+    # Build dictionary of default values from parser
+    defaults = {}
+    for action in parser._actions:
+        if action.dest != "help" and action.default is not None:
+            defaults[action.dest] = action.default
+
+    return parser, defaults
+
+
+def main():
+    parser, defaults = _build_parser()
+
     # Parse all arguments (known args) to get config path and any CLI arguments
     initial_args, remaining_argv = parser.parse_known_args()
 
@@ -390,71 +548,46 @@ def main():
     # Use initial_args as base (contains CLI values)
     args = initial_args
 
-    # Build dictionary of default values from parser
-    defaults = {}
-    for action in parser._actions:
-        if action.dest != "help" and action.default is not None:
-            defaults[action.dest] = action.default
-
     # Merge config with args (CLI overrides config)
     args = merge_config_with_args(config, args, defaults)
 
     # Now args contains merged values (CLI overrides config)
 
-    # Parse load/store ranges if specified
-    load_store_offset_ranges = None
-    if args.load_store_ranges is not None:
-        if isinstance(args.load_store_ranges, str):
-            load_store_offset_ranges = parse_load_store_ranges(args.load_store_ranges)
-        else:
-            # Assume it's already a list of tuples (from config)
-            load_store_offset_ranges = args.load_store_ranges
-
-    # Handle list-instructions
+    # Handle list-instructions (needs only the definitions, not a configured ISA)
     if args.list_instructions:
-        isa = RISCVISA(load_store_offset_min=args.load_store_offset_min,
-                       load_store_offset_max=args.load_store_offset_max,
-                       load_store_offset_ranges=load_store_offset_ranges,
-                       rd_min=args.rd_min, rd_max=args.rd_max,
-                       rs1_min=args.rs1_min, rs1_max=args.rs1_max,
-                       rs2_min=args.rs2_min, rs2_max=args.rs2_max)
-        print(f"Total instructions: {len(isa.instructions)}")
-        for instr in isa.instructions:
-            print(f"  {instr.name:8} {instr.format.value:4} opcode={instr.opcode:07b}")
+        metadata = RISCVISA.metadata()
+        print(f"Total instructions: {len(metadata)}")
+        for name, fmt, opcode in metadata:
+            print(f"  {name:8} {fmt:4} opcode={opcode:07b}")
         return 0
 
-    # Generate instructions
-    if args.seed is not None:
-        random.seed(args.seed)
+    # Generate everything from one seeded RNG owned by the ISA (shared by the
+    # pattern and sequence generators)
+    rng = random.Random(args.seed)
 
     isa = RISCVISA(load_store_offset_min=args.load_store_offset_min,
                    load_store_offset_max=args.load_store_offset_max,
-                   load_store_offset_ranges=load_store_offset_ranges,
+                   load_store_offset_ranges=args.load_store_ranges,
                    rd_min=args.rd_min, rd_max=args.rd_max,
                    rs1_min=args.rs1_min, rs1_max=args.rs1_max,
-                   rs2_min=args.rs2_min, rs2_max=args.rs2_max)
+                   rs2_min=args.rs2_min, rs2_max=args.rs2_max,
+                   rng=rng)
 
     # Apply weights based on command-line arguments
-    if args.weight_r != 1.0:
-        isa.set_weight_by_format(InstructionFormat.R, args.weight_r)
-    if args.weight_i != 1.0:
-        isa.set_weight_by_format(InstructionFormat.I, args.weight_i)
-    if args.weight_s != 1.0:
-        isa.set_weight_by_format(InstructionFormat.S, args.weight_s)
-    if args.weight_b != 1.0:
-        isa.set_weight_by_format(InstructionFormat.B, args.weight_b)
-    if args.weight_u != 1.0:
-        isa.set_weight_by_format(InstructionFormat.U, args.weight_u)
-    if args.weight_j != 1.0:
-        isa.set_weight_by_format(InstructionFormat.J, args.weight_j)
+    format_weights = {
+        InstructionFormat.R: args.weight_r,
+        InstructionFormat.I: args.weight_i,
+        InstructionFormat.S: args.weight_s,
+        InstructionFormat.B: args.weight_b,
+        InstructionFormat.U: args.weight_u,
+        InstructionFormat.J: args.weight_j,
+    }
+    isa.set_weights_by_format({fmt: w for fmt, w in format_weights.items() if w != 1.0})
 
     # Apply special instruction weights (ecall, ebreak)
     if args.weight_special != 1.0:
-        for name in ['ecall', 'ebreak']:
-            try:
-                isa.set_weight_by_name(name, args.weight_special)
-            except ValueError:
-                pass  # Instruction might not exist (shouldn't happen)
+        isa.set_weights_by_name({name: args.weight_special
+                                 for name in ['ecall', 'ebreak'] if name in isa.weights})
 
     # Parse correlation types
     correlation_types_list = [t.strip() for t in args.correlation_types.split(',')] if hasattr(args, 'correlation_types') else []
@@ -485,72 +618,52 @@ def main():
     else:
         instructions = isa.instructions
 
+    def random_fill(n: int) -> List[Tuple[int, str]]:
+        """Generate n random instructions from the selected list, drawing all picks in one batch."""
+        if n <= 0:
+            return []
+        return isa.generate_random_batch(n, instructions)
+
     # Generate based on pattern
     results = []
 
     if args.pattern == "random":
         # Use existing random generation with format filtering
-        for _ in range(args.count):
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results.extend(random_fill(args.count))
 
     elif args.pattern == "load-store":
         # Generate load-store pairs
         pairs_needed = args.count // 2
         extra_needed = args.count % 2
 
-        for _ in range(pairs_needed):
-            pair = pattern_gen.generate_load_store_pair()
-            results.extend(pair)
+        results = pattern_gen.generate_load_store_pairs(pairs_needed)
 
         # Add extra random instructions if count is odd
-        for _ in range(extra_needed):
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results.extend(random_fill(extra_needed))
 
     elif args.pattern == "raw":
         # Generate RAW hazard pairs
         pairs_needed = args.count // 2
         extra_needed = args.count % 2
 
-        for _ in range(pairs_needed):
-            pair = pattern_gen.generate_raw_hazard()
-            results.extend(pair)
-
-        for _ in range(extra_needed):
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results = pattern_gen.generate_raw_hazards(pairs_needed)
+        results.extend(random_fill(extra_needed))
 
     elif args.pattern == "war":
         # Generate WAR hazard pairs
         pairs_needed = args.count // 2
         extra_needed = args.count % 2
 
-        for _ in range(pairs_needed):
-            pair = pattern_gen.generate_war_hazard()
-            results.extend(pair)
-
-        for _ in range(extra_needed):
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results = pattern_gen.generate_war_hazards(pairs_needed)
+        results.extend(random_fill(extra_needed))
 
     elif args.pattern == "waw":
         # Generate WAW hazard pairs
         pairs_needed = args.count // 2
         extra_needed = args.count % 2
 
-        for _ in range(pairs_needed):
-            pair = pattern_gen.generate_waw_hazard()
-            results.extend(pair)
-
-        for _ in range(extra_needed):
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results = pattern_gen.generate_waw_hazards(pairs_needed)
+        results.extend(random_fill(extra_needed))
 
     elif args.pattern == "basic-block":
         # Generate basic block
@@ -570,10 +683,7 @@ def main():
         loop_seq = pattern_gen.generate_loop_pattern(iterations=3, body_size=body_size)
         results.extend(loop_seq)
         # Fill remaining with random if needed
-        while len(results) < args.count:
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results.extend(random_fill(args.count - len(results)))
 
     elif args.pattern == "conditional":
         # Generate conditional pattern
@@ -582,10 +692,7 @@ def main():
         else_size = max(1, args.count - then_size - 2)  # branch and jump
         cond_seq = pattern_gen.generate_conditional_pattern(then_size=then_size, else_size=else_size)
         results.extend(cond_seq)
-        while len(results) < args.count:
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results.extend(random_fill(args.count - len(results)))
 
     elif args.pattern == "memory":
         # Generate memory sequence
@@ -600,10 +707,7 @@ def main():
         body_size = max(1, args.count - prologue_epilogue_size)
         func_seq = pattern_gen.generate_function_sequence(body_size=body_size)
         results.extend(func_seq)
-        while len(results) < args.count:
-            instr = isa.get_weighted_random_from_list(instructions)
-            encoded, asm = isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+        results.extend(random_fill(args.count - len(results)))
 
     elif args.pattern == "sequence":
         # Generate using sequence patterns
@@ -611,6 +715,11 @@ def main():
             print("Error: --sequence-patterns-file is required for 'sequence' pattern", file=sys.stderr)
             return 1
 
+        # Parse pattern names if specified
+        pattern_names = None
+        if args.sequence_patterns:
+            pattern_names = frozenset(name.strip() for name in args.sequence_patterns.split(','))
+
         # Load sequence patterns
         try:
             pattern_loader = SequencePatternLoader(args.sequence_patterns_file)
@@ -618,11 +727,6 @@ def main():
             print(f"Error loading sequence patterns: {e}", file=sys.stderr)
             return 1
 
-        # Parse pattern names if specified
-        pattern_names = None
-        if args.sequence_patterns:
-            pattern_names = [name.strip() for name in args.sequence_patterns.split(',')]
-
         # Create sequence pattern generator
         seq_pattern_gen = SequencePatternGenerator(isa, pattern_loader, pattern_gen)
 
@@ -637,43 +741,27 @@ def main():
     # Ensure we have exactly count instructions (in case pattern generation gave wrong number)
     results = results[:args.count]
 
-    # Output
-    output_lines = []
-    current_address = args.base_address
-
-    for encoded, asm in results:
-        # Add PC comment if requested and format includes assembly
-        asm_with_pc = asm
-        if args.pc_comments and args.format in ["asm", "hexasm", "all"]:
-            asm_with_pc = f"{asm}  # 0x{current_address:08x}"
-
-        if args.format == "hex":
-            output_lines.append(format_hex(encoded))
-        elif args.format == "bin":
-            output_lines.append(format_binary(encoded))
-        elif args.format == "asm":
-            output_lines.append(asm_with_pc)
-        elif args.format == "hexasm":
-            if args.no_hex_comments:
-                # Old format: hex as field
-                output_lines.append(f"{format_hex(encoded)} {asm_with_pc}")
-            else:
-                # New format: hex as comment
-                output_lines.append(f"{asm_with_pc}  # {format_hex(encoded)}")
-        elif args.format == "all":
-            output_lines.append(f"{format_hex(encoded)} {format_binary(encoded)} {asm_with_pc}")
+    # Output, streamed line by line to the file or stdout
+    emit = make_line_formatter(args.format, args.pc_comments, args.no_hex_comments, len(results))
+    base_address = args.base_address
 
-        # Increment PC for next instruction (4 bytes per instruction)
-        current_address += 4
+    # PC of each instruction (4 bytes per instruction), produced by range in C
+    addresses = range(base_address, base_address + (len(results) << 2), 4)
 
-    output_text = "\n".join(output_lines)
+    sink = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        write = sink.write
+        for (encoded, asm), addr in zip(results, addresses):
+            write(emit(encoded, asm, addr))
+            write("\n")
+        if not results:
+            write("\n")
+    finally:
+        if args.output:
+            sink.close()
 
     if args.output:
-        with open(args.output, 'w') as f:
-            f.write(output_text + "\n")
         print(f"Generated {args.count} instructions to {args.output}")
-    else:
-        print(output_text)
 
     return 0
 
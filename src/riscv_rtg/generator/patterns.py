@@ -5,19 +5,40 @@ Implements common instruction patterns and data hazards.
 """
 
 import random
-from typing import List, Tuple, Optional, Dict, Any
-from riscv_rtg.isa.riscv_isa import RISCVISA, Instruction, InstructionFormat, Registers
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Tuple, Optional, Dict, Any
+from riscv_rtg.isa.riscv_isa import RISCVISA, Instruction, InstructionFormat, Registers, make_field_imm_gen
+
+
+def _make_fallback_imm_gens(rng) -> Dict[InstructionFormat, Callable[[], int]]:
+    """Full-range immediate generators for instructions without their own imm_gen."""
+    return {
+        InstructionFormat.I: make_field_imm_gen(12, signed=True, rng=rng),
+        InstructionFormat.S: make_field_imm_gen(12, signed=True, rng=rng),
+        InstructionFormat.B: make_field_imm_gen(13, signed=True, align=2, rng=rng),
+        InstructionFormat.U: make_field_imm_gen(20, signed=True, rng=rng),
+        InstructionFormat.J: make_field_imm_gen(21, signed=True, align=2, rng=rng),
+    }
 
 
 class SemanticState:
     """Tracks semantic state for instruction stream generation."""
 
+    __slots__ = ('register_writers', 'register_readers', '_mem_offsets', '_mem_idxs', 'loop_nesting',
+                 'current_loop_counter_reg', 'branch_targets', 'in_function',
+                 'stack_pointer_offset', 'saved_registers')
+
     def __init__(self):
         # Register tracking: map register number to last writer instruction index
         self.register_writers: Dict[int, int] = {}  # reg -> instruction index
         self.register_readers: Dict[int, List[int]] = {}  # reg -> list of instruction indices
-        # Memory tracking: map base register to access pattern
-        self.memory_accesses: Dict[int, List[Tuple[int, int]]] = {}  # base reg -> list of (offset, instr_idx)
+        # Memory tracking: per base register, parallel arrays of offsets and instruction indices
+        # (read only through .get, so lookups never add registers)
+        self._mem_offsets: Dict[int, array] = defaultdict(lambda: array('l'))
+        self._mem_idxs: Dict[int, array] = defaultdict(lambda: array('L'))
         # Control flow tracking
         self.loop_nesting: int = 0
         self.current_loop_counter_reg: Optional[int] = None
@@ -30,20 +51,25 @@ class SemanticState:
     def update_register_write(self, reg: int, instr_idx: int):
         """Update state when register is written."""
         self.register_writers[reg] = instr_idx
-        if reg not in self.register_readers:
-            self.register_readers[reg] = []
+        self.register_readers.setdefault(reg, [])
 
     def update_register_read(self, reg: int, instr_idx: int):
         """Update state when register is read."""
-        if reg not in self.register_readers:
-            self.register_readers[reg] = []
-        self.register_readers[reg].append(instr_idx)
+        self.register_readers.setdefault(reg, []).append(instr_idx)
 
     def update_memory_access(self, base_reg: int, offset: int, instr_idx: int):
         """Update state for memory load/store."""
-        if base_reg not in self.memory_accesses:
-            self.memory_accesses[base_reg] = []
-        self.memory_accesses[base_reg].append((offset, instr_idx))
+        self._mem_offsets[base_reg].append(offset)
+        self._mem_idxs[base_reg].append(instr_idx)
+
+    @property
+    def memory_accesses(self) -> Mapping[int, Tuple[Tuple[int, int], ...]]:
+        """Read-only snapshot of base reg -> (offset, instr_idx) pairs, built on demand.
+
+        Record accesses with update_memory_access; the snapshot cannot be modified.
+        """
+        return MappingProxyType({reg: tuple(zip(offsets, self._mem_idxs[reg]))
+                                 for reg, offsets in self._mem_offsets.items()})
 
     def enter_loop(self, counter_reg: Optional[int] = None):
         """Enter a loop nesting level."""
@@ -95,7 +121,15 @@ class SemanticState:
 
     def get_memory_access_pattern(self, base_reg: int) -> List[Tuple[int, int]]:
         """Get memory access pattern for base register."""
-        return self.memory_accesses.get(base_reg, [])
+        offsets = self._mem_offsets.get(base_reg)
+        if offsets is None:
+            return []
+        return list(zip(offsets, self._mem_idxs[base_reg]))
+
+    def get_memory_access_count(self, base_reg: int) -> int:
+        """Get number of memory accesses through base register."""
+        offsets = self._mem_offsets.get(base_reg)
+        return len(offsets) if offsets is not None else 0
 
     def is_in_loop(self) -> bool:
         """Check if currently in a loop."""
@@ -122,110 +156,144 @@ class CommentGenerator:
 
     def generate(self, instr: Instruction, rd: int, rs1: int, rs2: int, imm: int, instr_idx: int) -> Optional[str]:
         """Generate comment for instruction, or None if no comment."""
-        if self.semantic_state is None or self.detail_level == "none":
+        state = self.semantic_state
+        if state is None or self.detail_level == "none":
             return None
 
-        comments = []
-        # Data dependency comments
-        if rd != 0:
-            last_writer = self.semantic_state.get_last_writer(rd)
+        # Reduce the state to the values the comment text depends on, so that
+        # recurring instructions in the same context reuse the formatted text
+        detail = self.detail_level
+        last_writer = state.get_last_writer(rd) if rd != 0 else None
+        loop_counter = state.get_current_loop_counter_reg() if state.is_in_loop() else None
+        in_function = state.in_function
+        if detail == "detailed":
+            rs1_reads = len(state.get_readers(rs1)) if rs1 != 0 else 0
+            rs2_reads = len(state.get_readers(rs2)) if rs2 != 0 else 0
+            accesses = (state.get_memory_access_count(rs1)
+                        if instr.name in _LOAD_STORE_NAMES else 0)
+            pc = instr_idx * 4 if instr.format in _PC_RELATIVE_FORMATS else 0
+            stack_offset = state.stack_pointer_offset if in_function else 0
+        else:
             if last_writer is not None:
-                if self.detail_level == "minimal":
-                    comments.append(f"[REG_WRITE {rd}]")
-                elif self.detail_level == "medium":
-                    comments.append(f"reg x{rd} written")
-                else:  # detailed
-                    comments.append(f"register x{rd} previously written at instruction {last_writer}")
-        if rs1 != 0:
-            readers = self.semantic_state.get_readers(rs1)
-            if self.detail_level == "minimal":
-                comments.append(f"[REG_READ {rs1}]")
-            elif self.detail_level == "medium":
-                comments.append(f"reads x{rs1}")
-            else:
-                comments.append(f"reads register x{rs1} (read {len(readers)} times previously)")
-        if rs2 != 0:
-            readers = self.semantic_state.get_readers(rs2)
-            if self.detail_level == "minimal":
-                comments.append(f"[REG_READ {rs2}]")
-            elif self.detail_level == "medium":
-                comments.append(f"reads x{rs2}")
-            else:
-                comments.append(f"reads register x{rs2} (read {len(readers)} times previously)")
-
-        # Memory access comments
-        if instr.name in ['lb', 'lh', 'lw', 'lbu', 'lhu']:
-            if self.detail_level == "minimal":
-                comments.append("[LOAD]")
-            elif self.detail_level == "medium":
-                comments.append(f"load from x{rs1}+{imm}")
-            else:
-                accesses = self.semantic_state.get_memory_access_pattern(rs1)
-                comments.append(f"load from address x{rs1}+{imm} ({len(accesses)} previous accesses to this base)")
-        elif instr.name in ['sb', 'sh', 'sw']:
-            if self.detail_level == "minimal":
-                comments.append("[STORE]")
-            elif self.detail_level == "medium":
-                comments.append(f"store to x{rs1}+{imm}")
-            else:
-                accesses = self.semantic_state.get_memory_access_pattern(rs1)
-                comments.append(f"store to address x{rs1}+{imm} ({len(accesses)} previous accesses to this base)")
-
-        # Control flow comments
-        if instr.format == InstructionFormat.B:
-            if self.detail_level == "minimal":
-                comments.append("[BRANCH]")
-            elif self.detail_level == "medium":
-                comments.append(f"branch target PC{'+' if imm >= 0 else ''}{imm}")
-            else:
-                target = instr_idx * 4 + imm  # approximate PC
-                comments.append(f"branch to PC {target:#x} (offset {imm})")
-        elif instr.format == InstructionFormat.J:
-            if self.detail_level == "minimal":
-                comments.append("[JUMP]")
-            elif self.detail_level == "medium":
-                comments.append(f"jump target PC{'+' if imm >= 0 else ''}{imm}")
-            else:
-                target = instr_idx * 4 + imm
-                comments.append(f"jump to PC {target:#x} (offset {imm})")
-
-        # Loop context comments
-        if self.semantic_state.is_in_loop():
-            counter_reg = self.semantic_state.get_current_loop_counter_reg()
-            if counter_reg is not None and (rd == counter_reg or rs1 == counter_reg or rs2 == counter_reg):
-                if self.detail_level == "minimal":
-                    comments.append("[LOOP_CTR]")
-                elif self.detail_level == "medium":
-                    comments.append(f"loop counter x{counter_reg}")
-                else:
-                    comments.append(f"uses loop counter register x{counter_reg}")
-
-        # Function context comments
-        if self.semantic_state.in_function:
-            if self.detail_level == "minimal":
-                comments.append("[FUNC]")
-            elif self.detail_level == "medium":
-                comments.append("in function")
-            else:
-                comments.append(f"function context, stack offset {self.semantic_state.stack_pointer_offset}")
+                last_writer = 0  # only whether rd was written matters
+            rs1_reads = rs2_reads = accesses = pc = stack_offset = 0
+        return _format_comment(instr.name, instr.format, detail, rd, rs1, rs2, imm, last_writer,
+                               rs1_reads, rs2_reads, accesses, pc, loop_counter, in_function,
+                               stack_offset)
+
+
+_LOAD_NAMES = frozenset(['lb', 'lh', 'lw', 'lbu', 'lhu'])
+_STORE_NAMES = frozenset(['sb', 'sh', 'sw'])
+_LOAD_STORE_NAMES = _LOAD_NAMES | _STORE_NAMES
+_PC_RELATIVE_FORMATS = frozenset([InstructionFormat.B, InstructionFormat.J])
+_NO_OPERAND_NAMES = frozenset(['ebreak', 'ecall'])
+
+
+@lru_cache(maxsize=4096)
+def _format_comment(name: str, fmt: InstructionFormat, detail: str, rd: int, rs1: int, rs2: int,
+                    imm: int, last_writer: Optional[int], rs1_reads: int, rs2_reads: int,
+                    accesses: int, pc: int, loop_counter: Optional[int], in_function: bool,
+                    stack_offset: int) -> Optional[str]:
+    """Format a semantic comment from an instruction and the state values it depends on."""
+    comments = []
+    # Data dependency comments
+    if rd != 0 and last_writer is not None:
+        if detail == "minimal":
+            comments.append(f"[REG_WRITE {rd}]")
+        elif detail == "medium":
+            comments.append(f"reg x{rd} written")
+        else:  # detailed
+            comments.append(f"register x{rd} previously written at instruction {last_writer}")
+    if rs1 != 0:
+        if detail == "minimal":
+            comments.append(f"[REG_READ {rs1}]")
+        elif detail == "medium":
+            comments.append(f"reads x{rs1}")
+        else:
+            comments.append(f"reads register x{rs1} (read {rs1_reads} times previously)")
+    if rs2 != 0:
+        if detail == "minimal":
+            comments.append(f"[REG_READ {rs2}]")
+        elif detail == "medium":
+            comments.append(f"reads x{rs2}")
+        else:
+            comments.append(f"reads register x{rs2} (read {rs2_reads} times previously)")
+
+    # Memory access comments
+    if name in _LOAD_NAMES:
+        if detail == "minimal":
+            comments.append("[LOAD]")
+        elif detail == "medium":
+            comments.append(f"load from x{rs1}+{imm}")
+        else:
+            comments.append(f"load from address x{rs1}+{imm} ({accesses} previous accesses to this base)")
+    elif name in _STORE_NAMES:
+        if detail == "minimal":
+            comments.append("[STORE]")
+        elif detail == "medium":
+            comments.append(f"store to x{rs1}+{imm}")
+        else:
+            comments.append(f"store to address x{rs1}+{imm} ({accesses} previous accesses to this base)")
+
+    # Control flow comments
+    if fmt == InstructionFormat.B:
+        if detail == "minimal":
+            comments.append("[BRANCH]")
+        elif detail == "medium":
+            comments.append(f"branch target PC{'+' if imm >= 0 else ''}{imm}")
+        else:
+            target = pc + imm  # approximate PC
+            comments.append(f"branch to PC {target:#x} (offset {imm})")
+    elif fmt == InstructionFormat.J:
+        if detail == "minimal":
+            comments.append("[JUMP]")
+        elif detail == "medium":
+            comments.append(f"jump target PC{'+' if imm >= 0 else ''}{imm}")
+        else:
+            target = pc + imm
+            comments.append(f"jump to PC {target:#x} (offset {imm})")
+
+    # Loop context comments
+    if loop_counter is not None and (rd == loop_counter or rs1 == loop_counter or rs2 == loop_counter):
+        if detail == "minimal":
+            comments.append("[LOOP_CTR]")
+        elif detail == "medium":
+            comments.append(f"loop counter x{loop_counter}")
+        else:
+            comments.append(f"uses loop counter register x{loop_counter}")
+
+    # Function context comments
+    if in_function:
+        if detail == "minimal":
+            comments.append("[FUNC]")
+        elif detail == "medium":
+            comments.append("in function")
+        else:
+            comments.append(f"function context, stack offset {stack_offset}")
 
-        if not comments:
-            return None
+    if not comments:
+        return None
 
-        if self.detail_level == "minimal":
-            return " ".join(comments)
-        elif self.detail_level == "medium":
-            return "; ".join(comments)
-        else:  # detailed
-            return " | ".join(comments)
+    if detail == "minimal":
+        return " ".join(comments)
+    elif detail == "medium":
+        return "; ".join(comments)
+    else:  # detailed
+        return " | ".join(comments)
 
 
 class PatternGenerator:
     """Generates instruction sequences with specific patterns and dependencies."""
 
     def __init__(self, isa: RISCVISA, semantic_state: Optional[SemanticState] = None,
-                 comment_generator: Optional[CommentGenerator] = None, comment_detail: str = "medium"):
+                 comment_generator: Optional[CommentGenerator] = None, comment_detail: str = "medium",
+                 rng: Optional[random.Random] = None):
         self.isa = isa
+        # Shares the ISA's random source unless given its own
+        self.rng = rng if rng is not None else isa.rng
+        self._fallback_imm_gens = _make_fallback_imm_gens(self.rng)
+        # Immediate generators by instruction name, drawing from self.rng
+        self._imm_gens = isa.make_imm_gens(self.rng)
         self.semantic_state = semantic_state
         self.instr_idx = 0  # Current instruction index for semantic tracking
         if comment_generator is None and semantic_state is not None:
@@ -265,16 +333,16 @@ class PatternGenerator:
             instr: Specific instruction to generate. If None, selects random instruction.
         """
         if instr is None:
-            instr = self.isa.get_random_instruction()
+            instr = self.isa.get_random_instruction(rng=self.rng)
 
         # Generate random registers using ISA's configured ranges
-        rd = self.isa.get_random_rd()
-        rs1 = self.isa.get_random_rs1()
-        rs2 = self.isa.get_random_rs2()
+        rd = self.isa.get_random_rd(rng=self.rng)
+        rs1 = self.isa.get_random_rs1(rng=self.rng)
+        rs2 = self.isa.get_random_rs2(rng=self.rng)
         imm = 0
 
         # Special handling for certain instructions
-        if instr.name in ['ebreak', 'ecall']:
+        if instr.name in _NO_OPERAND_NAMES:
             # These have no registers or immediates
             rd = rs1 = rs2 = imm = 0
         elif instr.format == InstructionFormat.R:
@@ -337,30 +405,16 @@ class PatternGenerator:
 
     def _get_instr_by_name(self, name: str) -> Optional[Instruction]:
         """Get instruction by name from ISA."""
-        for instr in self.isa.instructions:
-            if instr.name == name:
-                return instr
-        return None
+        return self.isa.get_instruction_by_name(name)
 
     def _get_immediate(self, instr):
         """Get a random immediate appropriate for the instruction."""
-        if instr.imm_gen:
-            return instr.imm_gen()
+        imm_gen = self._imm_gens.get(instr.name)
+        if imm_gen:
+            return imm_gen()
         # Default fallback based on format
-        if instr.format == InstructionFormat.R:
-            return 0
-        elif instr.format == InstructionFormat.I:
-            return random.randint(-2048, 2047)
-        elif instr.format == InstructionFormat.S:
-            return random.randint(-2048, 2047)
-        elif instr.format == InstructionFormat.B:
-            return random.randint(-4096, 4094) & ~1
-        elif instr.format == InstructionFormat.U:
-            return random.randint(-524288, 524287)
-        elif instr.format == InstructionFormat.J:
-            return random.randint(-1048576, 1048574) & ~1
-        else:
-            return 0
+        fallback = self._fallback_imm_gens.get(instr.format)
+        return fallback() if fallback else 0
 
     def generate_random_sequence(self, count: int) -> List[Tuple[int, str]]:
         """Generate random sequence of instructions (no specific pattern)."""
@@ -369,10 +423,18 @@ class PatternGenerator:
             results.append(self._generate_single_random_instruction())
         return results
 
-    def generate_load_store_pair(self, base_address: int = 0) -> List[Tuple[int, str]]:
-        """Generate a load followed by a store pattern.
-        Pattern: lw rd, offset(rs1) ; sw rd, offset2(rs2)
-        Creates dependency through rd register."""
+    def _write_instrs(self) -> List[Instruction]:
+        """Instructions that write rd (everything except stores/branches)."""
+        return [instr for instr in self.isa.instructions
+                if instr.format not in [InstructionFormat.S, InstructionFormat.B]]
+
+    def _read_instrs(self) -> List[Instruction]:
+        """Instructions that read rs1/rs2 (everything except U/J formats)."""
+        return [instr for instr in self.isa.instructions
+                if instr.format not in [InstructionFormat.U, InstructionFormat.J]]
+
+    def _load_store_instrs(self) -> Tuple[List[Instruction], List[Instruction]]:
+        """Load and store instruction pools for load-store pairs."""
         # Get load instructions (lw, lh, lb, lhu, lbu)
         load_instrs = [instr for instr in self.isa.instructions
                       if instr.name in ['lw', 'lh', 'lb', 'lhu', 'lbu']]
@@ -384,30 +446,52 @@ class PatternGenerator:
                        if instr.name in ['sw', 'sh', 'sb']]
         if not store_instrs:
             store_instrs = self.isa.get_instructions_by_format(InstructionFormat.S)
+        return load_instrs, store_instrs
 
+    def _generate_pairs(self, n: int, make_pair: Callable[[], List[Tuple[int, str]]]) -> List[Tuple[int, str]]:
+        """Generate n two-instruction patterns into a pre-sized flat list."""
+        results = [None] * (2 * n)
+        for i in range(0, 2 * n, 2):
+            results[i:i + 2] = make_pair()
+        return results
+
+    def generate_load_store_pair(self, base_address: int = 0) -> List[Tuple[int, str]]:
+        """Generate a load followed by a store pattern.
+        Pattern: lw rd, offset(rs1) ; sw rd, offset2(rs2)
+        Creates dependency through rd register."""
+        return self._load_store_pair(*self._load_store_instrs())
+
+    def generate_load_store_pairs(self, n: int) -> List[Tuple[int, str]]:
+        """Generate n load-store pairs as a flat list of 2n instructions."""
+        load_instrs, store_instrs = self._load_store_instrs()
+        return self._generate_pairs(n, lambda: self._load_store_pair(load_instrs, store_instrs))
+
+    def _load_store_pair(self, load_instrs: List[Instruction],
+                         store_instrs: List[Instruction]) -> List[Tuple[int, str]]:
+        """Generate one load-store pair from the given instruction pools."""
         if not load_instrs or not store_instrs:
             return self.generate_random_sequence(2)
 
         # Choose random load and store
-        load = random.choice(load_instrs)
-        store = random.choice(store_instrs)
+        load = self.rng.choice(load_instrs)
+        store = self.rng.choice(store_instrs)
 
         # Generate registers: rd for load, rs2 for store (same register creates dependency)
-        rd = self.isa.get_random_rd(exclude_zero=True)
-        rs1 = self.isa.get_random_rs1(exclude_zero=True)
+        rd = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
+        rs1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
         rs2 = rd  # Same register creates dependency
         # For store, we need rs1 for base address (can be same or different)
-        store_rs1 = self.isa.get_random_rs1(exclude_zero=True)
+        store_rs1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
 
         # Generate immediates using ISA's offset generation if available
         if hasattr(self.isa, 'generate_load_store_offset'):
-            load_imm = self.isa.generate_load_store_offset()
-            store_imm = self.isa.generate_load_store_offset()
+            load_imm = self.isa.generate_load_store_offset(rng=self.rng)
+            store_imm = self.isa.generate_load_store_offset(rng=self.rng)
         else:
             offset_min = getattr(self.isa, 'load_store_offset_min', -2048)
             offset_max = getattr(self.isa, 'load_store_offset_max', 2047)
-            load_imm = random.randint(offset_min, offset_max)
-            store_imm = random.randint(offset_min, offset_max)
+            load_imm = self.rng.randint(offset_min, offset_max)
+            store_imm = self.rng.randint(offset_min, offset_max)
 
         # Encode instructions
         load_encoded = load.encode(rd=rd, rs1=rs1, rs2=0, imm=load_imm)
@@ -429,20 +513,24 @@ class PatternGenerator:
     def generate_raw_hazard(self) -> List[Tuple[int, str]]:
         """Generate RAW (Read After Write) hazard.
         Pattern: instr1 writes to rd, instr2 reads from same register as rs1/rs2."""
-        # Get instructions that write to registers (most instructions except stores/branches)
-        write_instrs = [instr for instr in self.isa.instructions
-                       if instr.format not in [InstructionFormat.S, InstructionFormat.B]]
-        read_instrs = [instr for instr in self.isa.instructions
-                      if instr.format not in [InstructionFormat.U, InstructionFormat.J]]
+        return self._raw_hazard_pair(self._write_instrs(), self._read_instrs())
+
+    def generate_raw_hazards(self, n: int) -> List[Tuple[int, str]]:
+        """Generate n RAW hazard pairs as a flat list of 2n instructions."""
+        write_instrs, read_instrs = self._write_instrs(), self._read_instrs()
+        return self._generate_pairs(n, lambda: self._raw_hazard_pair(write_instrs, read_instrs))
 
+    def _raw_hazard_pair(self, write_instrs: List[Instruction],
+                         read_instrs: List[Instruction]) -> List[Tuple[int, str]]:
+        """Generate one RAW hazard pair from the given instruction pools."""
         if len(write_instrs) < 2:
             return self.generate_random_sequence(2)
 
         # First instruction writes to rd
-        instr1 = random.choice(write_instrs)
-        rd = self.isa.get_random_rd(exclude_zero=True)
-        rs1 = self.isa.get_random_rs1(exclude_zero=True)
-        rs2 = self.isa.get_random_rs2(exclude_zero=True)
+        instr1 = self.rng.choice(write_instrs)
+        rd = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
+        rs1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
+        rs2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
 
         # Generate first instruction
         if instr1.format == InstructionFormat.R:
@@ -464,18 +552,18 @@ class PatternGenerator:
             asm1 = f"{asm1}  # {comment1}"
 
         # Second instruction reads from the same register (RAW hazard)
-        instr2 = random.choice(read_instrs)
+        instr2 = self.rng.choice(read_instrs)
         # Choose whether to use rd as rs1 or rs2
-        use_as_rs1 = random.choice([True, False])
+        use_as_rs1 = self.rng.choice([True, False])
 
         if use_as_rs1:
             rs1_2 = rd
-            rs2_2 = self.isa.get_random_rs2(exclude_zero=True)
+            rs2_2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
         else:
-            rs1_2 = self.isa.get_random_rs1(exclude_zero=True)
+            rs1_2 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
             rs2_2 = rd
 
-        rd2 = self.isa.get_random_rd(exclude_zero=True) if instr2.format not in [InstructionFormat.S, InstructionFormat.B] else 0
+        rd2 = self.isa.get_random_rd(exclude_zero=True, rng=self.rng) if instr2.format not in [InstructionFormat.S, InstructionFormat.B] else 0
 
         # Generate second instruction
         if instr2.format == InstructionFormat.R:
@@ -504,30 +592,35 @@ class PatternGenerator:
     def generate_war_hazard(self) -> List[Tuple[int, str]]:
         """Generate WAR (Write After Read) hazard.
         Pattern: instr1 reads from register, instr2 writes to same register."""
-        # Similar to RAW but reversed order of operations
-        read_instrs = [instr for instr in self.isa.instructions
-                      if instr.format not in [InstructionFormat.U, InstructionFormat.J]]
-        write_instrs = [instr for instr in self.isa.instructions
-                       if instr.format not in [InstructionFormat.S, InstructionFormat.B]]
+        return self._war_hazard_pair(self._read_instrs(), self._write_instrs())
 
+    def generate_war_hazards(self, n: int) -> List[Tuple[int, str]]:
+        """Generate n WAR hazard pairs as a flat list of 2n instructions."""
+        read_instrs, write_instrs = self._read_instrs(), self._write_instrs()
+        return self._generate_pairs(n, lambda: self._war_hazard_pair(read_instrs, write_instrs))
+
+    def _war_hazard_pair(self, read_instrs: List[Instruction],
+                         write_instrs: List[Instruction]) -> List[Tuple[int, str]]:
+        """Generate one WAR hazard pair from the given instruction pools."""
+        # Similar to RAW but reversed order of operations
         if len(read_instrs) < 2:
             return self.generate_random_sequence(2)
 
         # First instruction reads from register
-        instr1 = random.choice(read_instrs)
-        hazard_reg = self.isa.get_random_rd(exclude_zero=True)
+        instr1 = self.rng.choice(read_instrs)
+        hazard_reg = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
 
         # Choose whether hazard_reg is rs1 or rs2 for first instruction
-        use_as_rs1 = random.choice([True, False])
+        use_as_rs1 = self.rng.choice([True, False])
 
         if use_as_rs1:
             rs1 = hazard_reg
-            rs2 = self.isa.get_random_rs2(exclude_zero=True)
+            rs2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
         else:
-            rs1 = self.isa.get_random_rs1(exclude_zero=True)
+            rs1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
             rs2 = hazard_reg
 
-        rd = self.isa.get_random_rd(exclude_zero=True) if instr1.format not in [InstructionFormat.S, InstructionFormat.B] else 0
+        rd = self.isa.get_random_rd(exclude_zero=True, rng=self.rng) if instr1.format not in [InstructionFormat.S, InstructionFormat.B] else 0
 
         # Generate first instruction
         if instr1.format == InstructionFormat.R:
@@ -549,11 +642,11 @@ class PatternGenerator:
         self._record_instruction(instr1, rd, rs1, rs2, imm)
 
         # Second instruction writes to the same register (WAR hazard)
-        instr2 = random.choice(write_instrs)
+        instr2 = self.rng.choice(write_instrs)
         rd2 = hazard_reg  # Write to same register
 
-        rs1_2 = self.isa.get_random_rs1(exclude_zero=True)
-        rs2_2 = self.isa.get_random_rs2(exclude_zero=True)
+        rs1_2 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
+        rs2_2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
 
         # Generate second instruction
         if instr2.format == InstructionFormat.R:
@@ -579,22 +672,28 @@ class PatternGenerator:
     def generate_waw_hazard(self) -> List[Tuple[int, str]]:
         """Generate WAW (Write After Write) hazard.
         Pattern: Two instructions write to the same register."""
-        write_instrs = [instr for instr in self.isa.instructions
-                       if instr.format not in [InstructionFormat.S, InstructionFormat.B]]
+        return self._waw_hazard_pair(self._write_instrs())
+
+    def generate_waw_hazards(self, n: int) -> List[Tuple[int, str]]:
+        """Generate n WAW hazard pairs as a flat list of 2n instructions."""
+        write_instrs = self._write_instrs()
+        return self._generate_pairs(n, lambda: self._waw_hazard_pair(write_instrs))
 
+    def _waw_hazard_pair(self, write_instrs: List[Instruction]) -> List[Tuple[int, str]]:
+        """Generate one WAW hazard pair from the given instruction pool."""
         if len(write_instrs) < 2:
             return self.generate_random_sequence(2)
 
         # Choose two write instructions
-        instr1 = random.choice(write_instrs)
-        instr2 = random.choice([instr for instr in write_instrs if instr != instr1])
+        instr1 = self.rng.choice(write_instrs)
+        instr2 = self.rng.choice([instr for instr in write_instrs if instr != instr1])
 
         # Same register for both
-        hazard_reg = self.isa.get_random_rd(exclude_zero=True)
+        hazard_reg = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
 
         # Generate first instruction
-        rs1_1 = self.isa.get_random_rs1(exclude_zero=True)
-        rs2_1 = self.isa.get_random_rs2(exclude_zero=True)
+        rs1_1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
+        rs2_1 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
 
         if instr1.format == InstructionFormat.R:
             imm1 = 0
@@ -611,8 +710,8 @@ class PatternGenerator:
         asm1 = instr1.assembly(rd=hazard_reg, rs1=rs1_1, rs2=rs2_1, imm=imm1)
 
         # Generate second instruction (writes to same register)
-        rs1_2 = self.isa.get_random_rs1(exclude_zero=True)
-        rs2_2 = self.isa.get_random_rs2(exclude_zero=True)
+        rs1_2 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
+        rs2_2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
 
         if instr2.format == InstructionFormat.R:
             imm2 = 0
@@ -639,22 +738,22 @@ class PatternGenerator:
         instructions = []
         # Generate size-1 regular instructions
         for _ in range(size - 1):
-            instr = self.isa.get_random_instruction()
+            instr = self.isa.get_random_instruction(rng=self.rng)
             # Avoid branches/jumps in the middle
             while instr.format in [InstructionFormat.B, InstructionFormat.J]:
-                instr = self.isa.get_random_instruction()
+                instr = self.isa.get_random_instruction(rng=self.rng)
             encoded, asm = self._generate_single_random_instruction(instr)
             instructions.append((encoded, asm))
 
         # Possibly add a branch/jump at the end
-        if random.random() > 0.5:
+        if self.rng.random() > 0.5:
             branch_instrs = self.isa.get_instructions_by_format(InstructionFormat.B)
             jump_instrs = self.isa.get_instructions_by_format(InstructionFormat.J)
             if branch_instrs or jump_instrs:
-                if branch_instrs and (not jump_instrs or random.random() > 0.5):
-                    instr = random.choice(branch_instrs)
+                if branch_instrs and (not jump_instrs or self.rng.random() > 0.5):
+                    instr = self.rng.choice(branch_instrs)
                 else:
-                    instr = random.choice(jump_instrs)
+                    instr = self.rng.choice(jump_instrs)
                 encoded, asm = self._generate_single_random_instruction(instr)
                 instructions.append((encoded, asm))
             else:
@@ -688,9 +787,9 @@ class PatternGenerator:
         remaining = count
 
         while remaining > 0:
-            if remaining >= 2 and random.random() < density:
+            if remaining >= 2 and self.rng.random() < density:
                 # Generate a pattern
-                pattern_type = random.choice(patterns)
+                pattern_type = self.rng.choice(patterns)
                 if pattern_type == 'load_store' and remaining >= 2:
                     pair = self.generate_load_store_pair()
                     result.extend(pair)
@@ -737,7 +836,7 @@ class PatternGenerator:
         results = []
 
         # Choose a loop counter register
-        counter_reg = self.isa.get_random_rd(exclude_zero=True)
+        counter_reg = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
 
         # Enter loop in semantic state
         self.semantic_state.enter_loop(counter_reg)
@@ -800,8 +899,8 @@ class PatternGenerator:
         results = []
 
         # Choose registers for comparison
-        rs1 = self.isa.get_random_rs1(exclude_zero=True)
-        rs2 = self.isa.get_random_rs2(exclude_zero=True)
+        rs1 = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
+        rs2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
 
         # 1. Compare and branch to else block if not equal
         # Use beq with offset to skip then block
@@ -859,7 +958,7 @@ class PatternGenerator:
 
         # Choose base register if not provided
         if base_reg is None:
-            base_reg = self.isa.get_random_rs1(exclude_zero=True)
+            base_reg = self.isa.get_random_rs1(exclude_zero=True, rng=self.rng)
 
         # Get load and store instructions
         load_instrs = [instr for instr in self.isa.instructions
@@ -874,17 +973,17 @@ class PatternGenerator:
 
         for i in range(size):
             # Decide load vs store
-            is_load = random.choice([True, False]) if mix_load_store else True
+            is_load = self.rng.choice([True, False]) if mix_load_store else True
 
             if is_load:
-                instr = random.choice(load_instrs)
+                instr = self.rng.choice(load_instrs)
                 # Choose destination register
-                rd = self.isa.get_random_rd(exclude_zero=True)
+                rd = self.isa.get_random_rd(exclude_zero=True, rng=self.rng)
                 encoded, asm = self._generate_specific_instruction(instr, rd=rd, rs1=base_reg, imm=current_offset)
             else:
-                instr = random.choice(store_instrs)
+                instr = self.rng.choice(store_instrs)
                 # Choose source register
-                rs2 = self.isa.get_random_rs2(exclude_zero=True)
+                rs2 = self.isa.get_random_rs2(exclude_zero=True, rng=self.rng)
                 encoded, asm = self._generate_specific_instruction(instr, rs1=base_reg, rs2=rs2, imm=current_offset)
 
             results.append((encoded, asm))
@@ -920,7 +1019,7 @@ class PatternGenerator:
         s_registers = [8, 9, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27]
         if save_regs > 1:
             additional = min(save_regs - 1, len(s_registers))
-            registers_to_save.extend(random.sample(s_registers, additional))
+            registers_to_save.extend(self.rng.sample(s_registers, additional))
 
         # Sort for consistent stack layout
         registers_to_save.sort()
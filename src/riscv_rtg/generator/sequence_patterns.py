@@ -4,16 +4,100 @@ Sequence pattern generator for RISC-V instruction sequences.
 Extends the constraint system to define multi-instruction patterns.
 """
 
+import os
 import random
-import yaml
-from typing import List, Tuple, Optional, Dict, Any, Union
-from riscv_rtg.isa.riscv_isa import RISCVISA, Instruction, InstructionFormat, Registers
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import AbstractSet, Callable, List, Tuple, Optional, Dict, Any, Union
+from riscv_rtg.isa.riscv_isa import RISCVISA, Instruction, InstructionFormat, Registers, _ALL_FORMATS
+from riscv_rtg.utils.json_cache import json_cache_file, read_json_cache, write_json_cache
 from .patterns import PatternGenerator, SemanticState, CommentGenerator
 
+# Resolvers take the generator's RNG as rng; it defaults to the random module
+# for standalone use.
+
+
+def _random_register(variables: Dict[str, int], rng=random) -> int:
+    """Fallback register resolver: uniform over x0-x31."""
+    return rng.randint(0, 31)
+
+
+# Constraint key under 'immediates' for each instruction format
+_IMM_CONSTRAINT_KEYS = {
+    InstructionFormat.I: 'i_type',
+    InstructionFormat.S: 's_type',
+    InstructionFormat.B: 'b_type',
+    InstructionFormat.U: 'u_type',
+    InstructionFormat.J: 'j_type',
+}
+
+# Branch offsets used when a B-type step has no immediate constraint
+_DEFAULT_BRANCH_OFFSETS = (-20, -16, -12, -8, -4, 4, 8, 12, 16, 20)
+
+# Default: small immediate for I/S type, 0 for others
+_DEFAULT_IMM_RESOLVERS = {
+    InstructionFormat.R: lambda rng: 0,
+    InstructionFormat.I: lambda rng: rng.randint(-100, 100),
+    InstructionFormat.S: lambda rng: rng.randint(-100, 100),
+    InstructionFormat.B: lambda rng: rng.choice(_DEFAULT_BRANCH_OFFSETS),
+    InstructionFormat.U: lambda rng: 0,
+    InstructionFormat.J: lambda rng: 0,
+}
+
+
+# Formats whose default immediate is the constant 0
+_CONST_DEFAULT_IMM_FORMATS = frozenset({InstructionFormat.R, InstructionFormat.U, InstructionFormat.J})
+
+
+def _is_constant_register_spec(reg_spec: Any) -> bool:
+    """Return True if a register spec always resolves to the same register."""
+    if reg_spec is None or isinstance(reg_spec, int):
+        return True
+    return isinstance(reg_spec, dict) and reg_spec.get('type') == 'register' and 'value' in reg_spec
+
+
+def _pattern_gen_hooks(pattern_gen: Any) -> Tuple[Optional[Callable], Optional[Callable]]:
+    """Return the pattern generator's (comment, record) hooks, None where absent."""
+    return (getattr(pattern_gen, '_generate_comment', None),
+            getattr(pattern_gen, '_record_instruction', None))
+
+
+def _read_pattern_file(constraint_file: str) -> Dict[str, Any]:
+    """Parse a sequence pattern YAML file, using a JSON cache of it when fresh.
+
+    The cache lives in the user cache directory (see json_cache_file) and is
+    used while the YAML's mtime_ns and size match the recorded ones. Set
+    RISCV_RTG_NO_CACHE=1 to always parse the YAML.
+    """
+    use_cache = not os.environ.get('RISCV_RTG_NO_CACHE')
+    if use_cache:
+        st = os.stat(constraint_file)
+        cache_file = json_cache_file(constraint_file)
+        data = read_json_cache(cache_file, st)
+        if data is not None:
+            return data
+
+    # Imported here so generating from already-loaded patterns does not need PyYAML
+    import yaml
+    # Use the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(constraint_file, 'rb') as f:
+        data = yaml.load(f, Loader=loader)
+
+    if use_cache:
+        write_json_cache(cache_file, st, data)
+    return data
+
 
 class SequenceStep:
     """Represents a single step in a sequence pattern."""
 
+    __slots__ = ('step_index', 'step_type', 'description', 'instr_names', 'instr_weight',
+                 'constraints', 'variables', 'reg_specs', 'reg_resolvers',
+                 '_fixed_instr_name', '_var_publish', '_imm_resolvers', '_const_imm_formats',
+                 '_const_step')
+
     def __init__(self, step_data: Dict[str, Any], step_index: int):
         self.step_index = step_index
         self.step_type = step_data.get('step_type', 'instruction')
@@ -27,7 +111,9 @@ class SequenceStep:
     def _parse_instruction_step(self, step_data: Dict[str, Any]):
         """Parse instruction step configuration."""
         instr_data = step_data.get('instruction', {})
-        self.instr_names = instr_data.get('names', [])
+        self.instr_names: Tuple[str, ...] = tuple(instr_data.get('names', ()))
+        # Single-name steps need no random draw
+        self._fixed_instr_name = self.instr_names[0] if len(self.instr_names) == 1 else None
         self.instr_weight = instr_data.get('weight', 1.0)
 
         # Constraints for this step
@@ -35,6 +121,12 @@ class SequenceStep:
 
         # Variable definitions for this step
         self.variables = step_data.get('variables', {})
+        # (variable name, source register field) pairs published after each generate
+        self._var_publish: List[Tuple[str, str]] = [
+            (var_name, var_spec.get('source_field'))
+            for var_name, var_spec in self.variables.items()
+            if var_spec.get('type') == 'register' and var_spec.get('source_field') in ('rd', 'rs1', 'rs2')
+        ]
 
         # Register field specifications
         self.reg_specs = {}
@@ -44,21 +136,58 @@ class SequenceStep:
                 if reg_field in reg_constraints:
                     self.reg_specs[reg_field] = reg_constraints[reg_field]
 
-    def get_instruction_name(self) -> str:
+        # Per-field resolvers compiled from the specs (x0 for unconstrained fields)
+        self.reg_resolvers: Dict[str, Callable[..., int]] = {
+            reg_field: self._compile_register_spec(self.reg_specs.get(reg_field))
+            for reg_field in ['rd', 'rs1', 'rs2']
+        }
+
+        # Per-format immediate resolvers compiled from the immediate constraints
+        self._imm_resolvers = self._compile_immediate_resolvers()
+
+        # Steps with one name and constant registers are fully fixed when the
+        # immediate is constant too; generators then encode them once (see generate)
+        self._const_step = self._fixed_instr_name is not None and all(
+            _is_constant_register_spec(self.reg_specs.get(reg_field))
+            for reg_field in ['rd', 'rs1', 'rs2'])
+
+    def __reduce__(self):
+        # Compiled resolvers are closures, so pickle the step as its definition
+        step_data = {
+            'step_type': self.step_type,
+            'description': self.description,
+            'instruction': {'names': list(self.instr_names), 'weight': self.instr_weight},
+            'constraints': self.constraints,
+            'variables': self.variables,
+        }
+        return (SequenceStep, (step_data, self.step_index))
+
+    def get_instruction_name(self, rng=random) -> str:
         """Select an instruction name based on weights."""
+        if self._fixed_instr_name is not None:
+            return self._fixed_instr_name
         if not self.instr_names:
             raise ValueError(f"No instruction names defined for step {self.step_index}")
 
         # Simple random selection (could be weighted)
-        return random.choice(self.instr_names)
+        return rng.choice(self.instr_names)
 
     def resolve_register(self, reg_spec: Any, context: Dict[str, Any]) -> int:
         """Resolve a register specification to a concrete register number."""
+        return self._compile_register_spec(reg_spec)(context.get('variables', {}),
+                                                     context.get('rng', random))
+
+    def _compile_register_spec(self, reg_spec: Any) -> Callable[..., int]:
+        """Compile a register specification into a resolver taking the sequence variables and rng.
+
+        Register specs are static once loaded, so the spec type is dispatched here once
+        instead of on every resolve.
+        """
         if reg_spec is None:
-            return 0  # Default to x0
+            return lambda variables, rng=random: 0  # Default to x0
 
         if isinstance(reg_spec, int):
-            return reg_spec
+            return lambda variables, rng=random: reg_spec
 
         if isinstance(reg_spec, dict):
             spec_type = reg_spec.get('type')
@@ -66,103 +195,111 @@ class SequenceStep:
             if spec_type == 'register':
                 # Specific register or from allowed list
                 if 'value' in reg_spec:
-                    return reg_spec['value']
-                elif 'allowed' in reg_spec:
-                    allowed = reg_spec['allowed']
-                    if allowed:
-                        reg = random.choice(allowed)
-                        # Check zero exclusion
-                        if reg_spec.get('exclude_zero', False) and reg == 0:
-                            non_zero = [r for r in allowed if r != 0]
-                            if non_zero:
-                                reg = random.choice(non_zero)
-                        return reg
+                    value = reg_spec['value']
+                    return lambda variables, rng=random: value
+                allowed = reg_spec.get('allowed')
+                if allowed:
+                    # Apply zero exclusion to the list once (kept if it would leave nothing)
+                    allowed = tuple(allowed)
+                    if reg_spec.get('exclude_zero', False):
+                        allowed = tuple(r for r in allowed if r != 0) or allowed
+                    return lambda variables, rng=random: rng.choice(allowed)
 
             elif spec_type == 'variable':
                 # Reference to variable defined in sequence
                 var_name = reg_spec.get('name')
-                if var_name in context.get('variables', {}):
-                    return context['variables'][var_name]
+
+                def resolve_variable(variables: Dict[str, int], rng=random) -> int:
+                    if var_name in variables:
+                        return variables[var_name]
+                    return _random_register(variables, rng)
+                return resolve_variable
 
             elif spec_type == 'same_as':
                 # Same as another register in this step
                 other_field = reg_spec.get('field')
                 if other_field in self.reg_specs:
-                    return self.resolve_register(self.reg_specs[other_field], context)
+                    return lambda variables, rng=random: self.reg_resolvers[other_field](variables, rng)
 
             elif spec_type == 'different_from':
                 # Different from specified registers
                 exclude_regs = reg_spec.get('exclude', [])
-                exclude = set()
-                for reg_ref in exclude_regs:
-                    if isinstance(reg_ref, int):
-                        exclude.add(reg_ref)
-                    elif isinstance(reg_ref, dict) and reg_ref.get('type') == 'variable':
-                        var_name = reg_ref.get('name')
-                        if var_name in context.get('variables', {}):
-                            exclude.add(context['variables'][var_name])
-
-                # Try to find a register not in exclude list
-                allowed = reg_spec.get('allowed', list(range(32)))
-                candidates = [r for r in allowed if r not in exclude]
-                if candidates:
-                    return random.choice(candidates)
+                # Fixed registers are excluded now; variable exclusions at resolve time
+                exclude_static = frozenset(r for r in exclude_regs if isinstance(r, int))
+                exclude_vars = tuple(r.get('name') for r in exclude_regs
+                                     if isinstance(r, dict) and r.get('type') == 'variable')
+                static_candidates = tuple(r for r in reg_spec.get('allowed', range(32))
+                                          if r not in exclude_static)
+
+                def resolve_different(variables: Dict[str, int], rng=random) -> int:
+                    candidates = static_candidates
+                    if exclude_vars:
+                        exclude = {variables[v] for v in exclude_vars if v in variables}
+                        if exclude:
+                            candidates = [r for r in candidates if r not in exclude]
+
+                    # Try to find a register not in exclude list
+                    if candidates:
+                        return rng.choice(candidates)
+                    return _random_register(variables, rng)
+                return resolve_different
 
         # Default: random register 0-31
-        return random.randint(0, 31)
+        return _random_register
 
     def resolve_immediate(self, instr: Instruction, context: Dict[str, Any]) -> int:
         """Resolve immediate value based on constraints."""
-        imm_constraints = self.constraints.get('immediates', {})
+        return self._imm_resolvers[instr.format](context.get('rng', random))
 
-        # Determine immediate type based on instruction format
-        imm_type = None
-        if instr.format == InstructionFormat.I:
-            imm_type = 'i_type'
-        elif instr.format == InstructionFormat.S:
-            imm_type = 's_type'
-        elif instr.format == InstructionFormat.B:
-            imm_type = 'b_type'
-        elif instr.format == InstructionFormat.U:
-            imm_type = 'u_type'
-        elif instr.format == InstructionFormat.J:
-            imm_type = 'j_type'
-
-        if imm_type and imm_type in imm_constraints:
-            type_constraints = imm_constraints[imm_type]
-
-            if 'value' in type_constraints:
-                return type_constraints['value']
-
-            elif 'allowed_values' in type_constraints:
-                allowed = type_constraints['allowed_values']
-                if allowed:
-                    return random.choice(allowed)
-
-            elif 'min' in type_constraints and 'max' in type_constraints:
-                min_val = type_constraints['min']
-                max_val = type_constraints['max']
-
-                # Handle alignment
-                alignment = type_constraints.get('alignment', 1)
-                if alignment > 1:
-                    aligned_min = ((min_val + alignment - 1) // alignment) * alignment
-                    aligned_max = (max_val // alignment) * alignment
-                    if aligned_min > aligned_max:
-                        return 0
-                    value = random.randint(aligned_min // alignment, aligned_max // alignment) * alignment
-                else:
-                    value = random.randint(min_val, max_val)
-
-                return value
-
-        # Default: small immediate for I/S type, 0 for others
-        if instr.format in [InstructionFormat.I, InstructionFormat.S]:
-            return random.randint(-100, 100)
-        elif instr.format == InstructionFormat.B:
-            return random.choice([-20, -16, -12, -8, -4, 4, 8, 12, 16, 20])
-        else:
-            return 0
+    def _compile_immediate_resolvers(self) -> Dict[InstructionFormat, Callable[..., int]]:
+        """Build one immediate resolver per instruction format from the step constraints."""
+        imm_constraints = self.constraints.get('immediates', {})
+        resolvers = {}
+        const_formats = set()
+        for fmt in _ALL_FORMATS:
+            imm_type = _IMM_CONSTRAINT_KEYS.get(fmt)
+            resolver = None
+            if imm_type and imm_type in imm_constraints:
+                resolver = self._compile_immediate_constraint(imm_constraints[imm_type])
+            if resolver is not None:
+                if 'value' in imm_constraints[imm_type]:
+                    const_formats.add(fmt)
+            elif fmt in _CONST_DEFAULT_IMM_FORMATS:
+                const_formats.add(fmt)
+            resolvers[fmt] = resolver or _DEFAULT_IMM_RESOLVERS[fmt]
+        # Formats whose immediate never draws from the RNG
+        self._const_imm_formats = frozenset(const_formats)
+        return resolvers
+
+    @staticmethod
+    def _compile_immediate_constraint(type_constraints: Dict[str, Any]) -> Optional[Callable[..., int]]:
+        """Compile one immediate constraint, or return None to use the format default."""
+        if 'value' in type_constraints:
+            value = type_constraints['value']
+            return lambda rng: value
+
+        elif 'allowed_values' in type_constraints:
+            allowed = tuple(type_constraints['allowed_values'])
+            if allowed:
+                return lambda rng: rng.choice(allowed)
+
+        elif 'min' in type_constraints and 'max' in type_constraints:
+            min_val = type_constraints['min']
+            max_val = type_constraints['max']
+
+            # Handle alignment
+            alignment = type_constraints.get('alignment', 1)
+            if alignment > 1:
+                aligned_min = ((min_val + alignment - 1) // alignment) * alignment
+                aligned_max = (max_val // alignment) * alignment
+                if aligned_min > aligned_max:
+                    return lambda rng: 0
+                q_min = aligned_min // alignment
+                q_max = aligned_max // alignment
+                return lambda rng: rng.randint(q_min, q_max) * alignment
+            return lambda rng: rng.randint(min_val, max_val)
+
+        return None
 
     def generate(self, isa: RISCVISA, pattern_gen: PatternGenerator,
                  context: Dict[str, Any]) -> Tuple[int, str]:
@@ -170,50 +307,60 @@ class SequenceStep:
         if self.step_type != 'instruction':
             raise ValueError(f"Cannot generate non-instruction step type: {self.step_type}")
 
-        # Get instruction by name
-        instr_name = self.get_instruction_name()
-        instr = None
-        # Search for instruction in ISA
-        for i in isa.instructions:
-            if i.name == instr_name:
-                instr = i
-                break
-        if instr is None:
-            raise ValueError(f"Instruction not found: {instr_name}")
-
-        # Resolve registers
-        rd = self.resolve_register(self.reg_specs.get('rd'), context)
-        rs1 = self.resolve_register(self.reg_specs.get('rs1'), context)
-        rs2 = self.resolve_register(self.reg_specs.get('rs2'), context)
-
-        # Resolve immediate
-        imm = self.resolve_immediate(instr, context)
+        # Resolvers read and this step publishes the sequence variables directly
+        variables = context.setdefault('variables', {})
+        rng = context.get('rng', isa.rng)
+
+        # Per-generator cache of fully fixed steps, if the caller keeps one
+        const_cache = context.get('_const_cache') if self._const_step else None
+        const_result = const_cache.get(self) if const_cache is not None else None
+        if const_result is not None:
+            # Fixed step already encoded by this generator
+            instr, rd, rs1, rs2, imm, encoded, asm = const_result
+        else:
+            # Get instruction by name
+            instr_name = self.get_instruction_name(rng)
+            instr = isa.get_instruction_by_name(instr_name)
+            if instr is None:
+                raise ValueError(f"Instruction not found: {instr_name}")
+
+            # Resolve registers
+            rd = self.reg_resolvers['rd'](variables, rng)
+            rs1 = self.reg_resolvers['rs1'](variables, rng)
+            rs2 = self.reg_resolvers['rs2'](variables, rng)
+
+            # Resolve immediate
+            imm = self._imm_resolvers[instr.format](rng)
+
+            # Generate instruction using pattern generator
+            encoded = instr.encode(rd=rd, rs1=rs1, rs2=rs2, imm=imm)
+            asm = instr.assembly(rd=rd, rs1=rs1, rs2=rs2, imm=imm)
+
+            if const_cache is not None and instr.format in self._const_imm_formats:
+                const_cache[self] = (instr, rd, rs1, rs2, imm, encoded, asm)
 
         # Update context with variables defined in this step
-        if self.variables:
-            for var_name, var_spec in self.variables.items():
-                if var_spec.get('type') == 'register':
-                    source_field = var_spec.get('source_field')
-                    if source_field == 'rd':
-                        context.setdefault('variables', {})[var_name] = rd
-                    elif source_field == 'rs1':
-                        context.setdefault('variables', {})[var_name] = rs1
-                    elif source_field == 'rs2':
-                        context.setdefault('variables', {})[var_name] = rs2
-
-        # Generate instruction using pattern generator
-        encoded = instr.encode(rd=rd, rs1=rs1, rs2=rs2, imm=imm)
-        asm = instr.assembly(rd=rd, rs1=rs1, rs2=rs2, imm=imm)
+        if self._var_publish:
+            regs_by_field = {'rd': rd, 'rs1': rs1, 'rs2': rs2}
+            for var_name, source_field in self._var_publish:
+                variables[var_name] = regs_by_field[source_field]
+
+        # Hooks are resolved once per pattern; look them up for standalone calls
+        if '_gen_comment' in context:
+            gen_comment = context['_gen_comment']
+            record = context['_record']
+        else:
+            gen_comment, record = _pattern_gen_hooks(pattern_gen)
 
         # Add comment if pattern generator has comment generator
-        if hasattr(pattern_gen, '_generate_comment'):
-            comment = pattern_gen._generate_comment(instr, rd, rs1, rs2, imm)
+        if gen_comment is not None:
+            comment = gen_comment(instr, rd, rs1, rs2, imm)
             if comment:
                 asm = f"{asm}  # {comment}"
 
         # Record in semantic state
-        if hasattr(pattern_gen, '_record_instruction'):
-            pattern_gen._record_instruction(instr, rd, rs1, rs2, imm)
+        if record is not None:
+            record(instr, rd, rs1, rs2, imm)
 
         return encoded, asm
 
@@ -221,6 +368,9 @@ class SequenceStep:
 class SequencePattern:
     """Represents a complete sequence pattern."""
 
+    __slots__ = ('name', 'description', 'min_length', 'max_length', 'weight', 'steps',
+                 'global_variables')
+
     def __init__(self, name: str, pattern_data: Dict[str, Any]):
         self.name = name
         self.description = pattern_data.get('description', f'Sequence pattern {name}')
@@ -238,16 +388,31 @@ class SequencePattern:
         # Global variables for the pattern
         self.global_variables = pattern_data.get('variables', {})
 
-    def generate(self, isa: RISCVISA, pattern_gen: PatternGenerator) -> List[Tuple[int, str]]:
-        """Generate the complete sequence."""
+    def generate(self, isa: RISCVISA, pattern_gen: PatternGenerator,
+                 hooks: Optional[Tuple[Optional[Callable], Optional[Callable]]] = None,
+                 rng: Optional[random.Random] = None,
+                 const_cache: Optional[Dict['SequenceStep', Tuple]] = None) -> List[Tuple[int, str]]:
+        """Generate the complete sequence.
+
+        hooks is the (comment, record) pair from _pattern_gen_hooks; it is
+        looked up from pattern_gen when not supplied. rng defaults to the
+        pattern generator's (else the ISA's) random source. const_cache, if
+        given, holds the encodings of fully fixed steps for this isa.
+        """
+        if hooks is None:
+            hooks = _pattern_gen_hooks(pattern_gen)
+        if rng is None:
+            rng = getattr(pattern_gen, 'rng', isa.rng)
         results = []
-        context = {'variables': {}}
+        variables = {}
+        context = {'variables': variables, 'rng': rng, '_gen_comment': hooks[0], '_record': hooks[1],
+                   '_const_cache': const_cache}
 
         # Initialize global variables
         for var_name, var_spec in self.global_variables.items():
             if var_spec.get('type') == 'register':
                 # Simple random register for now
-                context['variables'][var_name] = random.randint(1, 31)  # Exclude x0
+                variables[var_name] = rng.randint(1, 31)  # Exclude x0
 
         # Generate each step
         for step in self.steps:
@@ -266,20 +431,32 @@ class SequencePatternLoader:
 
     def __init__(self, constraint_file: Optional[str] = None):
         self.patterns: Dict[str, SequencePattern] = {}
+        # Patterns sorted by step count with matching cumulative weights,
+        # built lazily by _get_selection_index()
+        self._selection_index: Optional[Tuple[List[int], List[SequencePattern], List[float]]] = None
 
         if constraint_file:
             self.load_patterns(constraint_file)
 
     def load_patterns(self, constraint_file: str):
         """Load sequence patterns from YAML file."""
-        with open(constraint_file, 'r') as f:
-            data = yaml.safe_load(f)
+        data = _read_pattern_file(constraint_file)
 
         sequence_patterns = data.get('sequence_patterns', {})
 
         for pattern_name, pattern_data in sequence_patterns.items():
             pattern = SequencePattern(pattern_name, pattern_data)
             self.patterns[pattern_name] = pattern
+        self._selection_index = None
+
+    def _get_selection_index(self) -> Tuple[List[int], List[SequencePattern], List[float]]:
+        """Return (step_counts, patterns, cumulative_weights) sorted by step count."""
+        if self._selection_index is None:
+            ordered = sorted(self.patterns.values(), key=lambda p: len(p.steps))
+            step_counts = [len(p.steps) for p in ordered]
+            cum_weights = list(accumulate(p.weight for p in ordered))
+            self._selection_index = (step_counts, ordered, cum_weights)
+        return self._selection_index
 
     def get_pattern(self, name: str) -> Optional[SequencePattern]:
         """Get a pattern by name."""
@@ -290,21 +467,36 @@ class SequencePatternLoader:
         return list(self.patterns.keys())
 
     def get_patterns_by_length(self, max_length: int) -> List[SequencePattern]:
-        """Get patterns that can fit within specified length."""
-        return [p for p in self.patterns.values() if len(p.steps) <= max_length]
+        """Get patterns that can fit within specified length, shortest first."""
+        step_counts, ordered, _ = self._get_selection_index()
+        return ordered[:bisect_right(step_counts, max_length)]
 
     def select_pattern(self, available_slots: int, weights: Optional[Dict[str, float]] = None,
-                      patterns: Optional[Dict[str, SequencePattern]] = None) -> Optional[SequencePattern]:
+                      patterns: Optional[Dict[str, SequencePattern]] = None,
+                      rng: Optional[random.Random] = None) -> Optional[SequencePattern]:
         """Select a pattern based on weights and available slots.
 
         Args:
             available_slots: Maximum number of instruction slots available
             weights: Custom weights for pattern selection
             patterns: Specific patterns to choose from (default: all patterns)
+            rng: Random source (default: the random module)
         """
+        rng = rng or random
         if patterns is None:
             patterns = self.patterns
 
+        if weights is None and patterns is self.patterns:
+            # Fast path: binary search the precomputed index instead of filtering
+            step_counts, ordered, cum_weights = self._get_selection_index()
+            n = bisect_right(step_counts, available_slots)
+            if n == 0:
+                return None
+            total_weight = cum_weights[n - 1]
+            if total_weight <= 0:
+                return rng.choice(ordered[:n])
+            return ordered[bisect_right(cum_weights, rng.random() * total_weight, 0, n - 1)]
+
         # Filter patterns by length
         candidates = []
         for pattern in patterns.values():
@@ -314,101 +506,188 @@ class SequencePatternLoader:
         if not candidates:
             return None
 
-        # Apply custom weights if provided
+        # Apply custom weights if provided, else use each pattern's own weight
         if weights:
-            weighted_candidates = []
-            for pattern in candidates:
-                weight = weights.get(pattern.name, pattern.weight)
-                weighted_candidates.append((pattern, weight))
-
-            # Weighted random selection
-            total_weight = sum(weight for _, weight in weighted_candidates)
-            if total_weight <= 0:
-                return random.choice(candidates)
-
-            r = random.uniform(0, total_weight)
-            cumulative = 0
-            for pattern, weight in weighted_candidates:
-                cumulative += weight
-                if r <= cumulative:
-                    return pattern
+            candidate_weights = [weights.get(p.name, p.weight) for p in candidates]
+        else:
+            candidate_weights = [p.weight for p in candidates]
 
-        # Default: weight-based selection
-        total_weight = sum(p.weight for p in candidates)
-        if total_weight <= 0:
-            return random.choice(candidates)
+        # Weighted random selection
+        if not any(w > 0 for w in candidate_weights):
+            return rng.choice(candidates)
+        return rng.choices(candidates, weights=candidate_weights, k=1)[0]
 
-        r = random.uniform(0, total_weight)
-        cumulative = 0
-        for pattern in candidates:
-            cumulative += pattern.weight
-            if r <= cumulative:
-                return pattern
+    def sample_patterns(self, k: int,
+                        patterns: Optional[Dict[str, SequencePattern]] = None,
+                        rng: Optional[random.Random] = None) -> List[SequencePattern]:
+        """Draw k patterns by weight in one batch, ignoring slot limits.
 
-        return candidates[0]
+        A draw that does not fit can be replaced with select_pattern(); rejecting
+        and re-selecting from the fitting patterns gives the same distribution
+        as selecting from them directly.
+        """
+        if patterns is None or patterns is self.patterns:
+            _, candidates, cum_weights = self._get_selection_index()
+        else:
+            candidates = list(patterns.values())
+            cum_weights = list(accumulate(p.weight for p in candidates))
+        if k <= 0 or not candidates:
+            return []
+        rng = rng or random
+        if cum_weights[-1] <= 0:
+            return rng.choices(candidates, k=k)
+        return rng.choices(candidates, cum_weights=cum_weights, k=k)
 
 
 class SequencePatternGenerator:
     """Generates instruction sequences using loaded patterns."""
 
     def __init__(self, isa: RISCVISA, pattern_loader: SequencePatternLoader,
-                 pattern_gen: Optional[PatternGenerator] = None):
+                 pattern_gen: Optional[PatternGenerator] = None, seed: Optional[int] = None):
         self.isa = isa
         self.pattern_loader = pattern_loader
-        self.pattern_gen = pattern_gen or PatternGenerator(isa)
+        # Random source for every draw: a private random.Random(seed) when seeded,
+        # else shared with the pattern generator (by default the ISA's). An external
+        # pattern generator draws from its own RNG, which seed could not cover.
+        if seed is not None and pattern_gen is not None:
+            raise ValueError("seed cannot be combined with pattern_gen; seed the pattern generator's rng instead")
+        if seed is not None:
+            self.rng = random.Random(seed)
+        else:
+            self.rng = getattr(pattern_gen, 'rng', isa.rng) if pattern_gen is not None else isa.rng
+        self.pattern_gen = pattern_gen or PatternGenerator(isa, rng=self.rng)
+        # Encodings of fully fixed steps for self.isa (see SequenceStep.generate)
+        self._const_cache: Dict[SequenceStep, Tuple] = {}
+        self._hooks = _pattern_gen_hooks(self.pattern_gen)
 
     def generate_sequence(self, count: int,
-                         pattern_names: Optional[List[str]] = None,
+                         pattern_names: Optional[AbstractSet[str]] = None,
                          pattern_density: float = 0.3) -> List[Tuple[int, str]]:
         """Generate a sequence mixing patterns and random instructions."""
-        results = []
-        remaining = count
-
         # Clip density to valid range
         pattern_density = max(0.0, min(1.0, pattern_density))
 
-        # Filter patterns if specific names provided
-        available_patterns = {}
+        # Filter patterns if specific names provided (kept in loader order so
+        # results do not depend on set iteration order)
         if pattern_names:
-            for name in pattern_names:
-                pattern = self.pattern_loader.get_pattern(name)
-                if pattern:
-                    available_patterns[name] = pattern
+            pattern_names = frozenset(pattern_names)
+            available_patterns = {name: pattern for name, pattern in self.pattern_loader.patterns.items()
+                                  if name in pattern_names}
         else:
             available_patterns = self.pattern_loader.patterns
 
-        while remaining > 0:
-            # Decide whether to generate a pattern
-            if remaining >= 2 and random.random() < pattern_density and available_patterns:
-                # Select a pattern that fits from available patterns
-                pattern = self.pattern_loader.select_pattern(remaining, patterns=available_patterns)
-                if pattern and len(pattern.steps) <= remaining:
-                    # Generate the pattern
-                    sequence = pattern.generate(self.isa, self.pattern_gen)
-                    results.extend(sequence)
-                    remaining -= len(sequence)
-                else:
-                    # Fallback to random instruction
-                    self._add_random_instruction(results)
-                    remaining -= 1
+        if not available_patterns or pattern_density <= 0.0:
+            return self.generate_random_batch(count)
+
+        schedule = self._plan_schedule(count, available_patterns, pattern_density)
+
+        # Emit the planned patterns and random instructions in order
+        results: List[Optional[Tuple[int, str]]] = [None] * count
+        random_instruction = self._random_instruction_source()
+        isa, pattern_gen, hooks, rng = self.isa, self.pattern_gen, self._hooks, self.rng
+        const_cache = self._const_cache
+
+        pos = 0
+        for pattern in schedule:
+            if pattern is None:
+                results[pos] = random_instruction()
+                pos += 1
             else:
-                # Single random instruction
-                self._add_random_instruction(results)
-                remaining -= 1
+                sequence = pattern.generate(isa, pattern_gen, hooks, rng, const_cache)
+                results[pos:pos + len(sequence)] = sequence
+                pos += len(sequence)
 
-        return results[:count]
+        return results
+
+    def _plan_schedule(self, count: int, available_patterns: Dict[str, SequencePattern],
+                       pattern_density: float) -> List[Optional[SequencePattern]]:
+        """Plan a sequence as a list of patterns, with None for each random instruction.
 
-    def _add_random_instruction(self, results: List[Tuple[int, str]]):
-        """Add a random instruction using pattern generator."""
-        # Try to use pattern generator's method first (handles semantic state)
+        Pattern-vs-random decisions and candidate patterns are drawn in batches up
+        front; a candidate that does not fit the remaining slots is re-selected
+        from the patterns that do.
+        """
+        if not available_patterns:
+            return [None] * count
+
+        rng = self.rng
+        draws = [rng.random() for _ in range(count)]
+        attempts = sum(1 for d in draws if d < pattern_density)
+        candidates = iter(self.pattern_loader.sample_patterns(attempts, patterns=available_patterns, rng=rng))
+        select_pattern = self.pattern_loader.select_pattern
+
+        schedule: List[Optional[SequencePattern]] = []
+        pos = 0
+        while pos < count:
+            remaining = count - pos
+            # Decide whether to generate a pattern
+            if remaining >= 2 and draws[pos] < pattern_density:
+                pattern = next(candidates)
+                if len(pattern.steps) > remaining:
+                    pattern = select_pattern(remaining, patterns=available_patterns, rng=rng)
+                # Zero-step patterns would not advance pos
+                if pattern and 0 < len(pattern.steps) <= remaining:
+                    schedule.append(pattern)
+                    pos += len(pattern.steps)
+                    continue
+            # Single random instruction (also the fallback when no pattern fits)
+            schedule.append(None)
+            pos += 1
+
+        return schedule
+
+    def generate_sequence_parallel(self, count: int,
+                                   pattern_names: Optional[AbstractSet[str]] = None,
+                                   pattern_density: float = 0.3,
+                                   workers: Optional[int] = None,
+                                   seed: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Generate a sequence in independent chunks across worker processes.
+
+        Each worker rebuilds the ISA from this generator's configuration,
+        receives a copy of the loaded patterns and seeds its RNG with
+        seed + worker index, so results depend only on count, workers and
+        seed. Workers use a plain PatternGenerator: semantic tracking and
+        comments do not carry over.
+        """
+        workers = max(1, min(workers or os.cpu_count() or 1, count))
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+
+        isa = self.isa
+        isa_config = {
+            'weights': dict(isa.weights),
+            'load_store_offset_ranges': list(isa.load_store_offset_ranges),
+            'rd_min': isa.rd_min, 'rd_max': isa.rd_max,
+            'rs1_min': isa.rs1_min, 'rs1_max': isa.rs1_max,
+            'rs2_min': isa.rs2_min, 'rs2_max': isa.rs2_max,
+        }
+        chunk, extra = divmod(count, workers)
+        jobs = [(isa_config, self.pattern_loader.patterns, pattern_names,
+                 pattern_density, chunk + (1 if i < extra else 0), seed + i)
+                for i in range(workers)]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_generate_sequence_chunk, jobs))
+        return [item for results in chunks for item in results]
+
+    def generate_random_batch(self, count: int) -> List[Tuple[int, str]]:
+        """Generate count random instructions, drawing every instruction choice in one batch."""
+        isa = self.isa
+        instrs = isa.get_weighted_random_batch(isa.instructions, count, rng=self.rng)
+        random_instruction = self._random_instruction_source()
+        return [random_instruction(instr) for instr in instrs]
+
+    def _random_instruction_source(self) -> Callable[[Optional[Instruction]], Tuple[int, str]]:
+        """Return a callable producing one random (encoded, assembly) instruction.
+
+        The callable takes an optional instruction; when omitted one is chosen by weight.
+        """
+        # Prefer the pattern generator's method (handles semantic state)
         if hasattr(self.pattern_gen, '_generate_single_random_instruction'):
-            encoded, asm = self.pattern_gen._generate_single_random_instruction()
-            results.append((encoded, asm))
-        else:
-            # Fallback: generate directly from ISA
-            instr = self.isa.get_random_instruction()
-            encoded, asm = self.isa.generate_random_instruction(instr)
-            results.append((encoded, asm))
+            return self.pattern_gen._generate_single_random_instruction
+
+        # Fallback: generate directly from ISA
+        return self.isa.generate_random_instruction
 
     def generate_specific_pattern(self, pattern_name: str) -> List[Tuple[int, str]]:
         """Generate a specific named pattern."""
@@ -416,4 +695,13 @@ class SequencePatternGenerator:
         if not pattern:
             raise ValueError(f"Pattern not found: {pattern_name}")
 
-        return pattern.generate(self.isa, self.pattern_gen)
\ No newline at end of file
+        return pattern.generate(self.isa, self.pattern_gen, self._hooks, self.rng, self._const_cache)
+
+
+def _generate_sequence_chunk(job: Tuple) -> List[Tuple[int, str]]:
+    """Worker for generate_sequence_parallel: rebuild the generator and run one chunk."""
+    isa_config, patterns, pattern_names, pattern_density, count, seed = job
+    loader = SequencePatternLoader()
+    loader.patterns = patterns
+    generator = SequencePatternGenerator(RISCVISA(rng=random.Random(seed), **isa_config), loader)
+    return generator.generate_sequence(count, pattern_names, pattern_density)
@@ -23,7 +23,9 @@ class RiscvOpcode(IntEnum):
     CUSTOM    = 0b0001011
 
 
-class RiscvFunct3(IntEnum):
+# Plain int attributes rather than IntEnum: several funct3 names share a value,
+# which IntEnum would collapse into aliases.
+class RiscvFunct3:
     """RISC-V instruction funct3 values matching C++ RiscvFunct3 enum."""
     # Load
     LB        = 0b000
@@ -108,4 +110,21 @@ INSTRUCTION_FORMAT_TO_TYPE = {
     'B': RiscvInstructionType.B_TYPE,
     'U': RiscvInstructionType.U_TYPE,
     'J': RiscvInstructionType.J_TYPE,
-}
\ No newline at end of file
+}
+
+# Same mapping as a list indexed by ord(format) - ord('A'), for per-instruction lookups
+_FMT_TBL = [RiscvInstructionType.UNKNOWN] * 26
+for _fmt, _type in INSTRUCTION_FORMAT_TO_TYPE.items():
+    _FMT_TBL[ord(_fmt) - ord('A')] = _type
+del _fmt, _type
+
+
+def format_to_type(fmt: str) -> RiscvInstructionType:
+    """Return the RiscvInstructionType for an uppercase format letter ('R', 'I', ...).
+
+    Any other character, including lowercase letters, maps to UNKNOWN.
+    """
+    index = ord(fmt) - ord('A')
+    if 0 <= index < 26:
+        return _FMT_TBL[index]
+    return RiscvInstructionType.UNKNOWN
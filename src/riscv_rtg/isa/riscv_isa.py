@@ -6,10 +6,14 @@ Core classes for RISC-V instruction formats and random generation.
 
 import random
 import os
+import sys
 import yaml
 import struct
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
 from enum import Enum
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Callable, List, Mapping, Tuple, Optional, Dict, Any
 from .enums import RiscvOpcode, RiscvFunct3, RiscvFunct7, RiscvInstructionType, INSTRUCTION_FORMAT_TO_TYPE
 
 
@@ -49,35 +53,33 @@ class Registers(Enum):
     T6 = 31
 
     @staticmethod
-    def random(exclude_zero: bool = False) -> int:
-        """Return a random register number (0-31)."""
+    def random(exclude_zero: bool = False, rng=None) -> int:
+        """Return a random register number (0-31), drawn from rng (default: the random module)."""
+        randint = (rng or random).randint
         if exclude_zero:
-            return random.randint(1, 31)
-        return random.randint(0, 31)
+            return randint(1, 31)
+        return randint(0, 31)
 
     @staticmethod
-    def random_range(min_reg: int, max_reg: int, exclude_zero: bool = False) -> int:
+    def random_range(min_reg: int, max_reg: int, exclude_zero: bool = False, rng=None) -> int:
         """Return a random register number within [min_reg, max_reg] inclusive."""
         if min_reg < 0 or max_reg > 31 or min_reg > max_reg:
             raise ValueError(f"Invalid register range [{min_reg}, {max_reg}]. Must be within 0-31.")
         if exclude_zero and min_reg == 0 and max_reg == 0:
             raise ValueError("Cannot exclude zero register when range is [0, 0].")
 
-        # Generate random register in range
-        reg = random.randint(min_reg, max_reg)
-        if exclude_zero and reg == 0:
-            # If zero is selected and excluded, try again (could be infinite if range only contains zero)
-            # But we already checked above, so range must contain non-zero registers
-            while reg == 0:
-                reg = random.randint(min_reg, max_reg)
-        return reg
+        # Register numbers are non-negative, so zero can only be in the range as min_reg.
+        # Excluding it just shifts the lower bound up by one (single draw, no retry loop).
+        if exclude_zero and min_reg == 0:
+            min_reg = 1
+        return (rng or random).randint(min_reg, max_reg)
 
     @staticmethod
-    def random_from_list(allowed_registers: List[int]) -> int:
+    def random_from_list(allowed_registers: List[int], rng=None) -> int:
         """Return a random register number from allowed list."""
         if not allowed_registers:
             raise ValueError("Allowed registers list cannot be empty.")
-        return random.choice(allowed_registers)
+        return (rng or random).choice(allowed_registers)
 
 
 class InstructionFormat(Enum):
@@ -90,96 +92,135 @@ class InstructionFormat(Enum):
     J = "J"  # jump
 
 
+_ALL_FORMATS = tuple(InstructionFormat)
+
+# Small-int format ids for hot-path dispatch (int == is cheaper than Enum ==)
+_FMT_R, _FMT_I, _FMT_S, _FMT_B, _FMT_U, _FMT_J = range(6)
+_FMT_IDS = {
+    InstructionFormat.R: _FMT_R,
+    InstructionFormat.I: _FMT_I,
+    InstructionFormat.S: _FMT_S,
+    InstructionFormat.B: _FMT_B,
+    InstructionFormat.U: _FMT_U,
+    InstructionFormat.J: _FMT_J,
+}
+
+# Bound on cached subset cumulative-weight tables per ISA
+_MAX_SUBSET_CUM_WEIGHTS = 64
+
+# Per-format (rd, rs1, rs2, imm) masks: -1 keeps the field, 0 zeroes it
+_FIELD_MASKS = {
+    InstructionFormat.R: (-1, -1, -1, 0),   # No immediate for R-type
+    InstructionFormat.I: (-1, -1, 0, -1),   # Only rd, rs1, and immediate
+    InstructionFormat.S: (0, -1, -1, -1),   # Only rs1, rs2, and immediate
+    InstructionFormat.B: (0, -1, -1, -1),   # Only rs1, rs2, and immediate
+    InstructionFormat.U: (-1, 0, 0, -1),    # Only rd and immediate
+    InstructionFormat.J: (-1, 0, 0, -1),    # Only rd and immediate
+}
+_NO_FIELDS_MASK = (0, 0, 0, 0)
+
+
+def _make_r_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # R-type: funct7(31:25), rs2(24:20), rs1(19:15), funct3(14:12), rd(11:7), opcode(6:0)
+        return template | ((rs2 & 0x1f) << 20) | ((rs1 & 0x1f) << 15) | ((rd & 0x1f) << 7)
+    return encode
+
+
+def _make_i_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # I-type: imm[11:0](31:20), rs1(19:15), funct3(14:12), rd(11:7), opcode(6:0)
+        return template | ((imm & 0xfff) << 20) | ((rs1 & 0x1f) << 15) | ((rd & 0x1f) << 7)
+    return encode
+
+
+def _make_s_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # S-type: imm[11:5](31:25), rs2(24:20), rs1(19:15), funct3(14:12), imm[4:0](11:7), opcode(6:0)
+        return template | (((imm >> 5) & 0x7f) << 25) | ((rs2 & 0x1f) << 20) | \
+               ((rs1 & 0x1f) << 15) | ((imm & 0x1f) << 7)
+    return encode
+
+
+def _make_b_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # B-type: imm[12|10:5](31:25), rs2(24:20), rs1(19:15), funct3(14:12), imm[4:1|11](11:7), opcode(6:0)
+        imm12 = (imm >> 12) & 0x1
+        imm10_5 = (imm >> 5) & 0x3f
+        imm4_1 = (imm >> 1) & 0xf
+        imm11 = (imm >> 11) & 0x1
+        return template | ((imm12 << 6 | imm10_5) << 25) | ((rs2 & 0x1f) << 20) | \
+               ((rs1 & 0x1f) << 15) | ((imm4_1 << 1 | imm11) << 7)
+    return encode
+
+
+def _make_u_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # U-type: imm[31:12](31:12), rd(11:7), opcode(6:0)
+        return template | (((imm >> 12) & 0xfffff) << 12) | ((rd & 0x1f) << 7)
+    return encode
+
+
+def _make_j_encoder(template: int):
+    def encode(rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
+        # J-type: imm[20|10:1|11|19:12](31:12), rd(11:7), opcode(6:0)
+        imm20 = (imm >> 20) & 0x1
+        imm10_1 = (imm >> 1) & 0x3ff
+        imm11 = (imm >> 11) & 0x1
+        imm19_12 = (imm >> 12) & 0xff
+        imm_encoded = (imm20 << 19) | (imm10_1 << 9) | (imm11 << 8) | imm19_12
+        return template | (imm_encoded << 12) | ((rd & 0x1f) << 7)
+    return encode
+
+
+# Encoder factories indexed by format id: each takes the fixed opcode/funct bits
+# and returns an encode(rd, rs1, rs2, imm=0) with no per-call format dispatch
+_ENCODER_FACTORIES = (_make_r_encoder, _make_i_encoder, _make_s_encoder,
+                      _make_b_encoder, _make_u_encoder, _make_j_encoder)
+
+
 class Instruction:
     """Base class for RISC-V instructions."""
 
+    __slots__ = ('name', 'format', 'opcode', 'funct3', 'funct7', 'imm_gen', 'rng',
+                 'format_id', '_template', '_field_mask', 'encode')
+
     def __init__(self, name: str, fmt: InstructionFormat, opcode: int,
                  funct3: Optional[int] = None, funct7: Optional[int] = None,
-                 imm_gen=None):
-        self.name = name
+                 imm_gen=None, rng=None):
+        self.name = sys.intern(name)
         self.format = fmt
+        # Small-int format id (see _FMT_IDS) for list-indexed dispatch tables
+        self.format_id = _FMT_IDS[fmt]
         self.opcode = opcode
         self.funct3 = funct3
         self.funct7 = funct7
         self.imm_gen = imm_gen  # function that returns random immediate
-
-    def encode(self, rd: int, rs1: int, rs2: int, imm: int = 0) -> int:
-        """Encode instruction into 32-bit word."""
-        if self.format == InstructionFormat.R:
-            # R-type: funct7(31:25), rs2(24:20), rs1(19:15), funct3(14:12), rd(11:7), opcode(6:0)
-            return ((self.funct7 & 0x7f) << 25) | ((rs2 & 0x1f) << 20) | \
-                   ((rs1 & 0x1f) << 15) | ((self.funct3 & 0x7) << 12) | \
-                   ((rd & 0x1f) << 7) | (self.opcode & 0x7f)
-        elif self.format == InstructionFormat.I:
-            # I-type: imm[11:0](31:20), rs1(19:15), funct3(14:12), rd(11:7), opcode(6:0)
-            imm12 = imm & 0xfff
-            return ((imm12 & 0xfff) << 20) | ((rs1 & 0x1f) << 15) | \
-                   ((self.funct3 & 0x7) << 12) | ((rd & 0x1f) << 7) | \
-                   (self.opcode & 0x7f)
-        elif self.format == InstructionFormat.S:
-            # S-type: imm[11:5](31:25), rs2(24:20), rs1(19:15), funct3(14:12), imm[4:0](11:7), opcode(6:0)
-            imm11_5 = (imm >> 5) & 0x7f
-            imm4_0 = imm & 0x1f
-            return ((imm11_5 & 0x7f) << 25) | ((rs2 & 0x1f) << 20) | \
-                   ((rs1 & 0x1f) << 15) | ((self.funct3 & 0x7) << 12) | \
-                   ((imm4_0 & 0x1f) << 7) | (self.opcode & 0x7f)
-        elif self.format == InstructionFormat.B:
-            # B-type: imm[12|10:5](31:25), rs2(24:20), rs1(19:15), funct3(14:12), imm[4:1|11](11:7), opcode(6:0)
-            imm12 = (imm >> 12) & 0x1
-            imm10_5 = (imm >> 5) & 0x3f
-            imm4_1 = (imm >> 1) & 0xf
-            imm11 = (imm >> 11) & 0x1
-            return ((imm12 << 6 | imm10_5) << 25) | ((rs2 & 0x1f) << 20) | \
-                   ((rs1 & 0x1f) << 15) | ((self.funct3 & 0x7) << 12) | \
-                   ((imm4_1 << 1 | imm11) << 7) | (self.opcode & 0x7f)
-        elif self.format == InstructionFormat.U:
-            # U-type: imm[31:12](31:12), rd(11:7), opcode(6:0)
-            imm31_12 = (imm >> 12) & 0xfffff
-            return ((imm31_12 & 0xfffff) << 12) | ((rd & 0x1f) << 7) | \
-                   (self.opcode & 0x7f)
-        elif self.format == InstructionFormat.J:
-            # J-type: imm[20|10:1|11|19:12](31:12), rd(11:7), opcode(6:0)
-            imm20 = (imm >> 20) & 0x1
-            imm10_1 = (imm >> 1) & 0x3ff
-            imm11 = (imm >> 11) & 0x1
-            imm19_12 = (imm >> 12) & 0xff
-            imm_encoded = (imm20 << 19) | (imm10_1 << 9) | (imm11 << 8) | imm19_12
-            return ((imm_encoded & 0xfffff) << 12) | ((rd & 0x1f) << 7) | \
-                   (self.opcode & 0x7f)
-        else:
-            raise ValueError(f"Unknown format: {self.format}")
+        # Source of random registers (the ISA's rng; default: the random module)
+        self.rng = rng if rng is not None else random
+        self._template = self._build_template()
+        # encode(rd, rs1, rs2, imm=0) -> 32-bit word, specialized for this format and template
+        self.encode = _ENCODER_FACTORIES[self.format_id](self._template)
+        # ecall/ebreak have no registers or immediates
+        self._field_mask = _NO_FIELDS_MASK if name in ['ebreak', 'ecall'] else _FIELD_MASKS[fmt]
+
+    def _build_template(self) -> int:
+        """Return the fixed opcode/funct3/funct7 bits of the encoding.
+
+        These fields never change between calls, so they are packed once and
+        baked into the format-specific encode().
+        """
+        template = self.opcode & 0x7f
+        if self.funct3 is not None and self.format_id in (_FMT_R, _FMT_I, _FMT_S, _FMT_B):
+            template |= (self.funct3 & 0x7) << 12
+        if self.funct7 is not None and self.format_id == _FMT_R:
+            template |= (self.funct7 & 0x7f) << 25
+        return template
 
     def generate_random(self) -> Tuple[int, str]:
         """Generate random instance of this instruction.
         Returns (encoded_instruction, assembly_string)."""
-        rd = Registers.random()
-        rs1 = Registers.random()
-        rs2 = Registers.random()
-        imm = 0
-
-        if self.imm_gen:
-            imm = self.imm_gen()
-
-        # Special handling for certain instructions
-        if self.name in ['ebreak', 'ecall']:
-            # These have no registers or immediates
-            rd = rs1 = rs2 = imm = 0
-        elif self.format == InstructionFormat.R:
-            # No immediate for R-type
-            imm = 0
-        elif self.format == InstructionFormat.U or self.format == InstructionFormat.J:
-            # Only rd and immediate
-            rs1 = rs2 = 0
-        elif self.format == InstructionFormat.I:
-            # Only rd, rs1, and immediate
-            rs2 = 0
-        elif self.format == InstructionFormat.S or self.format == InstructionFormat.B:
-            # Only rs1, rs2, and immediate
-            rd = 0
-
-        encoded = self.encode(rd, rs1, rs2, imm)
-        asm = self.assembly(rd, rs1, rs2, imm)
-        return encoded, asm
+        return self.generate_with_registers()
 
     def generate_with_registers(self, rd: Optional[int] = None, rs1: Optional[int] = None,
                                 rs2: Optional[int] = None, imm: Optional[int] = None) -> Tuple[int, str]:
@@ -196,32 +237,22 @@ class Instruction:
         """
         # Generate random registers if not provided
         if rd is None:
-            rd = Registers.random()
+            rd = Registers.random(rng=self.rng)
         if rs1 is None:
-            rs1 = Registers.random()
+            rs1 = Registers.random(rng=self.rng)
         if rs2 is None:
-            rs2 = Registers.random()
+            rs2 = Registers.random(rng=self.rng)
         if imm is None:
             imm = 0
             if self.imm_gen:
                 imm = self.imm_gen()
 
-        # Special handling for certain instructions
-        if self.name in ['ebreak', 'ecall']:
-            # These have no registers or immediates
-            rd = rs1 = rs2 = imm = 0
-        elif self.format == InstructionFormat.R:
-            # No immediate for R-type
-            imm = 0
-        elif self.format == InstructionFormat.U or self.format == InstructionFormat.J:
-            # Only rd and immediate
-            rs1 = rs2 = 0
-        elif self.format == InstructionFormat.I:
-            # Only rd, rs1, and immediate
-            rs2 = 0
-        elif self.format == InstructionFormat.S or self.format == InstructionFormat.B:
-            # Only rs1, rs2, and immediate
-            rd = 0
+        # Zero the fields this format does not use (see _FIELD_MASKS)
+        keep_rd, keep_rs1, keep_rs2, keep_imm = self._field_mask
+        rd &= keep_rd
+        rs1 &= keep_rs1
+        rs2 &= keep_rs2
+        imm &= keep_imm
 
         encoded = self.encode(rd, rs1, rs2, imm)
         asm = self.assembly(rd, rs1, rs2, imm)
@@ -234,9 +265,10 @@ class Instruction:
 
         reg_name = lambda r: f"x{r}"
 
-        if self.format == InstructionFormat.R:
+        fmt_id = self.format_id
+        if fmt_id == _FMT_R:
             return f"{self.name} {reg_name(rd)}, {reg_name(rs1)}, {reg_name(rs2)}"
-        elif self.format == InstructionFormat.I:
+        elif fmt_id == _FMT_I:
             # Handle shift instructions with shamt
             if self.name in ['slli', 'srli', 'srai']:
                 shamt = imm & 0x1f  # only lower 5 bits
@@ -247,13 +279,13 @@ class Instruction:
             else:
                 # Regular I-type: addi, xori, ori, andi, slti, sltiu
                 return f"{self.name} {reg_name(rd)}, {reg_name(rs1)}, {imm}"
-        elif self.format == InstructionFormat.S:
+        elif fmt_id == _FMT_S:
             return f"{self.name} {reg_name(rs2)}, {imm}({reg_name(rs1)})"
-        elif self.format == InstructionFormat.B:
+        elif fmt_id == _FMT_B:
             return f"{self.name} {reg_name(rs1)}, {reg_name(rs2)}, {imm}"
-        elif self.format == InstructionFormat.U:
+        elif fmt_id == _FMT_U:
             return f"{self.name} {reg_name(rd)}, {imm}"
-        elif self.format == InstructionFormat.J:
+        elif fmt_id == _FMT_J:
             return f"{self.name} {reg_name(rd)}, {imm}"
         else:
             return f"{self.name} unknown_format"
@@ -262,16 +294,74 @@ class Instruction:
         return f"{self.name} ({self.format.value}-type)"
 
 
+# Map definition format string to InstructionFormat
+_DEFINITION_FORMATS = {
+    'R_TYPE': InstructionFormat.R,
+    'I_TYPE': InstructionFormat.I,
+    'S_TYPE': InstructionFormat.S,
+    'B_TYPE': InstructionFormat.B,
+    'U_TYPE': InstructionFormat.U,
+    'J_TYPE': InstructionFormat.J,
+}
+
+
+@lru_cache(maxsize=1)
+def _load_definitions() -> Dict[str, Any]:
+    """Parse definitions/rv32i.yaml once per process (callers must not modify the result)."""
+    yaml_path = os.path.join(os.path.dirname(__file__), 'definitions', 'rv32i.yaml')
+    with open(yaml_path, 'r') as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+def _make_imm_gen(imm_spec: Dict[str, Any], rng) -> Callable[[], int]:
+    """Return an immediate generator for a definition's 'immediate' spec, drawing from rng."""
+    bits = imm_spec['bits']
+    signed = imm_spec.get('signed', False)
+    align = imm_spec.get('align', 1)
+    range_spec = imm_spec.get('range')
+    if signed:
+        full_min = -(1 << (bits - 1))
+        full_max = (1 << (bits - 1)) - 1
+    else:
+        full_min = 0
+        full_max = (1 << bits) - 1
+    if range_spec:
+        min_val, max_val = range_spec
+    else:
+        min_val, max_val = full_min, full_max
+    if (min_val == full_min and max_val in (full_max, full_max & ~(align - 1))
+            and align & (align - 1) == 0):
+        # Full aligned field range: draw the bits directly
+        return make_field_imm_gen(bits, signed, align, rng=rng)
+
+    randint = rng.randint
+
+    def imm_gen_func():
+        val = randint(min_val, max_val)
+        if align > 1:
+            val = val & ~(align - 1)
+        return val
+    return imm_gen_func
+
+
 class RISCVISA:
     """RISC-V instruction set definition and generator."""
 
+    # Cached result of metadata()
+    _metadata: Optional[Tuple[Tuple[str, str, int], ...]] = None
+
     def __init__(self, weights: Optional[Dict[str, float]] = None,
                  load_store_offset_min: int = -2048,
                  load_store_offset_max: int = 2047,
                  load_store_offset_ranges: Optional[List[Tuple[int, int]]] = None,
                  rd_min: int = 0, rd_max: int = 31,
                  rs1_min: int = 0, rs1_max: int = 31,
-                 rs2_min: int = 0, rs2_max: int = 31):
+                 rs2_min: int = 0, rs2_max: int = 31,
+                 rng: Optional[random.Random] = None):
+        # Source of all random draws; defaults to the random module, so
+        # random.seed() keeps controlling generation
+        self.rng = rng if rng is not None else random
+
         # Handle load/store offset ranges
         if load_store_offset_ranges is not None:
             # Validate ranges
@@ -304,27 +394,40 @@ class RISCVISA:
         self.rs2_max = rs2_max
 
         self.instructions: List[Instruction] = []
+        # Lookup indexes, filled in by _load_instructions
+        self._by_name: Dict[str, Instruction] = {}
+        self._by_format: Dict[InstructionFormat, List[Instruction]] = {fmt: [] for fmt in _ALL_FORMATS}
         self._load_instructions()
 
-        # Initialize weights: default is 1.0 for all instructions
-        self.weights: Dict[str, float] = {}
+        # Cumulative weights for weighted picks, rebuilt lazily after weight changes.
+        # Subset tables are keyed by id() and hold the list (to keep the id valid)
+        # and a copy of its contents (to notice in-place changes).
+        self._cum_weights: List[float] = []
+        self._cum_dirty = True
+        self._subset_cum_weights: Dict[int, Tuple[List[Instruction], List[Instruction], List[float]]] = {}
+
+        # Initialize weights: default is 1.0 for all instructions.
+        # Private so every change goes through set_weight*/reset_weights, which
+        # mark the cumulative tables stale; read them through the weights property.
+        self._weights: Dict[str, float] = {}
         for instr in self.instructions:
-            self.weights[instr.name] = 1.0
+            self._weights[instr.name] = 1.0
 
         # Update with any provided weights
         if weights:
             for name, weight in weights.items():
-                if name in self.weights:
-                    self.weights[name] = weight
+                if name in self._weights:
+                    self._weights[name] = weight
                 else:
                     raise ValueError(f"Unknown instruction '{name}' in weights")
 
-    def generate_load_store_offset(self) -> int:
+    def generate_load_store_offset(self, rng=None) -> int:
         """Generate a random load/store offset from configured ranges."""
+        rng = rng or self.rng
         # Randomly select a range
-        base, size = random.choice(self.load_store_offset_ranges)
+        base, size = rng.choice(self.load_store_offset_ranges)
         # Generate offset within range [base, base + size - 1]
-        return random.randint(base, base + size - 1)
+        return rng.randint(base, base + size - 1)
 
     def _validate_register_range(self, reg_type: str, min_val: int, max_val: int):
         """Validate register range parameters."""
@@ -333,17 +436,20 @@ class RISCVISA:
         if min_val > max_val:
             raise ValueError(f"{reg_type} min ({min_val}) > max ({max_val})")
 
-    def get_random_rd(self, exclude_zero: bool = False) -> int:
+    def get_random_rd(self, exclude_zero: bool = False, rng=None) -> int:
         """Return a random destination register within configured rd range."""
-        return Registers.random_range(self.rd_min, self.rd_max, exclude_zero=exclude_zero)
+        return Registers.random_range(self.rd_min, self.rd_max, exclude_zero=exclude_zero,
+                                      rng=rng or self.rng)
 
-    def get_random_rs1(self, exclude_zero: bool = False) -> int:
+    def get_random_rs1(self, exclude_zero: bool = False, rng=None) -> int:
         """Return a random source register 1 within configured rs1 range."""
-        return Registers.random_range(self.rs1_min, self.rs1_max, exclude_zero=exclude_zero)
+        return Registers.random_range(self.rs1_min, self.rs1_max, exclude_zero=exclude_zero,
+                                      rng=rng or self.rng)
 
-    def get_random_rs2(self, exclude_zero: bool = False) -> int:
+    def get_random_rs2(self, exclude_zero: bool = False, rng=None) -> int:
         """Return a random source register 2 within configured rs2 range."""
-        return Registers.random_range(self.rs2_min, self.rs2_max, exclude_zero=exclude_zero)
+        return Registers.random_range(self.rs2_min, self.rs2_max, exclude_zero=exclude_zero,
+                                      rng=rng or self.rng)
 
     def generate_random_instruction(self, instr: Optional[Instruction] = None) -> Tuple[int, str]:
         """Generate a random instruction using configured register ranges.
@@ -367,29 +473,17 @@ class RISCVISA:
 
     def _load_instructions(self):
         """Load RV32I instructions from unified YAML definitions."""
-        yaml_path = os.path.join(os.path.dirname(__file__), 'definitions', 'rv32i.yaml')
-        with open(yaml_path, 'r') as f:
-            data = yaml.safe_load(f)
+        data = _load_definitions()
 
         # Build mapping from enum names to values
         opcode_map = {name: value for name, value in data['enums']['opcode'].items()}
         funct3_map = {name: value for name, value in data['enums']['funct3'].items()}
         funct7_map = {name: value for name, value in data['enums']['funct7'].items()}
 
-        # Map format string to InstructionFormat
-        format_map = {
-            'R_TYPE': InstructionFormat.R,
-            'I_TYPE': InstructionFormat.I,
-            'S_TYPE': InstructionFormat.S,
-            'B_TYPE': InstructionFormat.B,
-            'U_TYPE': InstructionFormat.U,
-            'J_TYPE': InstructionFormat.J,
-        }
-
         for instr_def in data['instructions']:
             mnemonic = instr_def['mnemonic']
             fmt_str = instr_def['format']
-            fmt = format_map[fmt_str]
+            fmt = _DEFINITION_FORMATS[fmt_str]
 
             # Resolve opcode, funct3, funct7
             opcode = opcode_map[instr_def['opcode']]
@@ -398,94 +492,255 @@ class RISCVISA:
 
             # Immediate generator
             imm_spec = instr_def.get('immediate')
-            imm_gen = None
-            if imm_spec is not None:
-                bits = imm_spec['bits']
-                signed = imm_spec.get('signed', False)
-                align = imm_spec.get('align', 1)
-                range_spec = imm_spec.get('range')
-                if range_spec:
-                    min_val, max_val = range_spec
-                else:
-                    if signed:
-                        min_val = -(1 << (bits - 1))
-                        max_val = (1 << (bits - 1)) - 1
-                    else:
-                        min_val = 0
-                        max_val = (1 << bits) - 1
-                # Create closure with captured values
-                def make_imm_gen(min_val, max_val, align):
-                    def imm_gen_func():
-                        val = random.randint(min_val, max_val)
-                        if align > 1:
-                            val = val & ~(align - 1)
-                        return val
-                    return imm_gen_func
-                imm_gen = make_imm_gen(min_val, max_val, align)
-
-            self.instructions.append(Instruction(mnemonic, fmt, opcode, funct3, funct7, imm_gen=imm_gen))
-
-    def get_random_instruction(self) -> Instruction:
+            imm_gen = _make_imm_gen(imm_spec, self.rng) if imm_spec is not None else None
+
+            instr = Instruction(mnemonic, fmt, opcode, funct3, funct7, imm_gen=imm_gen, rng=self.rng)
+            self.instructions.append(instr)
+            self._by_name[instr.name] = instr
+            self._by_format[fmt].append(instr)
+
+    def make_imm_gens(self, rng) -> Dict[str, Optional[Callable[[], int]]]:
+        """Return per-instruction immediate generators (by name) that draw from rng.
+
+        For this ISA's own rng these are the instructions' imm_gen functions.
+        """
+        if rng is self.rng:
+            return {instr.name: instr.imm_gen for instr in self.instructions}
+        imm_specs = {instr_def['mnemonic']: instr_def.get('immediate')
+                     for instr_def in _load_definitions()['instructions']}
+        return {instr.name: (_make_imm_gen(imm_specs[instr.name], rng)
+                             if imm_specs.get(instr.name) is not None else None)
+                for instr in self.instructions}
+
+    @classmethod
+    def metadata(cls) -> Tuple[Tuple[str, str, int], ...]:
+        """Return (name, format value, opcode) for every instruction, in definition order.
+
+        Reads only the definitions, without building an ISA instance.
+        """
+        if cls._metadata is None:
+            data = _load_definitions()
+            opcode_map = data['enums']['opcode']
+            cls._metadata = tuple(
+                (instr_def['mnemonic'], _DEFINITION_FORMATS[instr_def['format']].value,
+                 opcode_map[instr_def['opcode']])
+                for instr_def in data['instructions'])
+        return cls._metadata
+
+    def _get_cum_weights(self, instruction_list: List[Instruction]) -> List[float]:
+        """Return cumulative weights for instruction_list, cached until weights change.
+
+        Subset tables are cached per list object and rebuilt if the list's
+        contents have changed since.
+        """
+        if self._cum_dirty:
+            self._cum_weights = list(accumulate(self._weights[instr.name] for instr in self.instructions))
+            self._subset_cum_weights.clear()
+            self._cum_dirty = False
+        if instruction_list is self.instructions:
+            return self._cum_weights
+
+        cache = self._subset_cum_weights
+        entry = cache.get(id(instruction_list))
+        if entry is not None and entry[0] is instruction_list and entry[1] == instruction_list:
+            return entry[2]
+        cum_weights = list(accumulate(self._weights[instr.name] for instr in instruction_list))
+        if len(cache) >= _MAX_SUBSET_CUM_WEIGHTS:
+            cache.clear()
+        cache[id(instruction_list)] = (instruction_list, list(instruction_list), cum_weights)
+        return cum_weights
+
+    def seed(self, seed=None) -> None:
+        """Re-seed this ISA's random source (the random module unless an rng was given)."""
+        self.rng.seed(seed)
+
+    def get_random_instruction(self, rng=None) -> Instruction:
         """Return a random instruction from the ISA using weighted selection."""
-        # Get weights for all instructions in order
-        weights = [self.weights[instr.name] for instr in self.instructions]
-        return random.choices(self.instructions, weights=weights, k=1)[0]
+        return (rng or self.rng).choices(self.instructions, cum_weights=self._get_cum_weights(self.instructions), k=1)[0]
+
+    def draw_many(self, n: int) -> List[Instruction]:
+        """Return n weighted random instructions from the ISA, drawn in a single batch."""
+        return self.get_weighted_random_batch(self.instructions, n)
 
-    def get_weighted_random_from_list(self, instruction_list: List[Instruction]) -> Instruction:
+    def get_weighted_random_from_list(self, instruction_list: List[Instruction], rng=None) -> Instruction:
         """Return a random instruction from a subset using weighted selection."""
         if not instruction_list:
             raise ValueError("Instruction list cannot be empty")
-        # Get weights for the provided instructions
-        weights = [self.weights[instr.name] for instr in instruction_list]
-        return random.choices(instruction_list, weights=weights, k=1)[0]
+        cum_weights = self._get_cum_weights(instruction_list)
+        return (rng or self.rng).choices(instruction_list, cum_weights=cum_weights, k=1)[0]
+
+    def get_weighted_random_batch(self, instruction_list: List[Instruction], k: int,
+                                  rng=None) -> List[Instruction]:
+        """Return k weighted random picks from a subset, drawn in a single batch."""
+        if not instruction_list:
+            raise ValueError("Instruction list cannot be empty")
+        cum_weights = self._get_cum_weights(instruction_list)
+        return (rng or self.rng).choices(instruction_list, cum_weights=cum_weights, k=k)
 
     def set_weight_by_name(self, name: str, weight: float):
         """Set weight for a specific instruction by name."""
-        if name not in self.weights:
+        if name not in self._weights:
             raise ValueError(f"Unknown instruction '{name}'")
         if weight < 0:
             raise ValueError(f"Weight must be non-negative, got {weight}")
-        self.weights[name] = weight
+        self._weights[name] = weight
+        self._cum_dirty = True
 
     def set_weight_by_format(self, fmt: InstructionFormat, weight: float):
         """Set weight for all instructions of a given format."""
         if weight < 0:
             raise ValueError(f"Weight must be non-negative, got {weight}")
-        for instr in self.instructions:
-            if instr.format == fmt:
-                self.weights[instr.name] = weight
+        for instr in self._by_format[fmt]:
+            self._weights[instr.name] = weight
+        self._cum_dirty = True
+
+    def set_weights_by_name(self, weights: Dict[str, float]):
+        """Set weights for several instructions by name in one update.
+
+        All names and weights are validated before any weight changes.
+        """
+        for name, weight in weights.items():
+            if name not in self._weights:
+                raise ValueError(f"Unknown instruction '{name}'")
+            if weight < 0:
+                raise ValueError(f"Weight must be non-negative, got {weight}")
+        self._weights.update(weights)
+        self._cum_dirty = True
+
+    def set_weights_by_format(self, weights: Dict[InstructionFormat, float]):
+        """Set weights for several instruction formats in one update.
+
+        All weights are validated before any weight changes.
+        """
+        for weight in weights.values():
+            if weight < 0:
+                raise ValueError(f"Weight must be non-negative, got {weight}")
+        self._weights.update({instr.name: weight
+                             for fmt, weight in weights.items()
+                             for instr in self._by_format[fmt]})
+        self._cum_dirty = True
+
+    @property
+    def weights(self) -> Mapping[str, float]:
+        """Read-only view of instruction weights by name; change them with set_weight*."""
+        return MappingProxyType(self._weights)
+
+    def reset_weights(self):
+        """Reset every instruction weight to the default 1.0."""
+        self._weights = dict.fromkeys(self._weights, 1.0)
+        self._cum_dirty = True
 
     def get_weight(self, name: str) -> float:
         """Get weight for a specific instruction."""
-        if name not in self.weights:
+        if name not in self._weights:
             raise ValueError(f"Unknown instruction '{name}'")
-        return self.weights[name]
+        return self._weights[name]
 
     def generate_random(self, count: int = 1) -> List[Tuple[int, str]]:
-        """Generate `count` random instructions.
+        """Generate `count` random instructions (see generate_random_batch).
         Returns list of (encoded, assembly)."""
-        results = []
-        for _ in range(count):
-            instr = self.get_random_instruction()
-            encoded, asm = self.generate_random_instruction(instr)
-            results.append((encoded, asm))
-        return results
+        return self.generate_random_batch(count)
+
+    def _draw_random_batch(self, count: int, instruction_list: Optional[List[Instruction]] = None):
+        """Draw `count` weighted instruction picks and rd/rs1/rs2/imm columns.
+
+        Registers use the configured ranges; fields a format does not use are
+        zeroed (see _FIELD_MASKS), so the columns can go straight to encode_batch.
+        """
+        if instruction_list is None:
+            instruction_list = self.instructions
+        instrs = self.get_weighted_random_batch(instruction_list, count)
+        randint = self.rng.randint
+        rds = [randint(self.rd_min, self.rd_max) for _ in range(count)]
+        rs1s = [randint(self.rs1_min, self.rs1_max) for _ in range(count)]
+        rs2s = [randint(self.rs2_min, self.rs2_max) for _ in range(count)]
+        imms = [instr.imm_gen() if instr.imm_gen else 0 for instr in instrs]
+        masks = [instr._field_mask for instr in instrs]
+        rds = [rd & mask[0] for rd, mask in zip(rds, masks)]
+        rs1s = [rs1 & mask[1] for rs1, mask in zip(rs1s, masks)]
+        rs2s = [rs2 & mask[2] for rs2, mask in zip(rs2s, masks)]
+        imms = [imm & mask[3] for imm, mask in zip(imms, masks)]
+        return instrs, rds, rs1s, rs2s, imms
+
+    def generate_random_batch(self, count: int,
+                              instruction_list: Optional[List[Instruction]] = None) -> List[Tuple[int, str]]:
+        """Generate `count` random instructions with picks and registers drawn column by column.
+
+        Instructions are weighted picks from instruction_list (default: all
+        instructions); registers use the configured ranges.
+        Returns list of (encoded, assembly)."""
+        instrs, rds, rs1s, rs2s, imms = self._draw_random_batch(count, instruction_list)
+        words = encode_batch(instrs, rds, rs1s, rs2s, imms)
+        return [(word, instr.assembly(rd, rs1, rs2, imm))
+                for word, instr, rd, rs1, rs2, imm in zip(words, instrs, rds, rs1s, rs2s, imms)]
+
+    def generate_binary(self, count: int = 1) -> bytes:
+        """Generate `count` random instructions as a little-endian binary image.
+
+        Draws the same instructions as generate_random(count) but skips the
+        assembly text. Returns count * 4 bytes, one 32-bit word per instruction."""
+        words = encode_batch(*self._draw_random_batch(count))
+        return struct.pack(f'<{count}I', *words)
 
     def get_instructions_by_format(self, fmt: InstructionFormat) -> List[Instruction]:
-        """Get all instructions of a given format."""
-        return [instr for instr in self.instructions if instr.format == fmt]
+        """Get all instructions of a given format.
+
+        The returned list is shared with the ISA's internal index and must not be modified.
+        """
+        return self._by_format[fmt]
+
+    def get_instruction_by_name(self, name: str) -> Optional[Instruction]:
+        """Get instruction by mnemonic, or None if not in the ISA."""
+        return self._by_name.get(name)
 
     def __str__(self) -> str:
         return f"RISCVISA with {len(self.instructions)} instructions"
 
 
 # Utility functions
+def make_field_imm_gen(bits: int, signed: bool, align: int = 1, rng=None):
+    """Return a generator of uniform immediates over a whole `bits`-wide field.
+
+    Draws the significant bits with getrandbits (from rng, default: the random
+    module) and sign-extends, which avoids randint's range handling and the
+    low-bit masking for aligned fields. `align` must be a power of two.
+    """
+    shift = align.bit_length() - 1
+    nbits = bits - shift
+    sign_bit = 1 << (bits - 1)
+    span = 1 << bits
+    getrandbits = (rng or random).getrandbits
+
+    if signed:
+        def imm_gen_func():
+            val = getrandbits(nbits) << shift
+            if val & sign_bit:
+                val -= span
+            return val
+    else:
+        def imm_gen_func():
+            return getrandbits(nbits) << shift
+    return imm_gen_func
+
+def encode_batch(instrs: List[Instruction], rd: List[int], rs1: List[int],
+                 rs2: List[int], imm: List[int]) -> List[int]:
+    """Encode parallel sequences of instructions and operands.
+
+    Element i of the result is instrs[i].encode(rd[i], rs1[i], rs2[i], imm[i]).
+    """
+    return [instr.encode(d, s1, s2, i)
+            for instr, d, s1, s2, i in zip(instrs, rd, rs1, rs2, imm)]
+
 def format_binary(word: int, bits: int = 32) -> str:
     """Format integer as binary string with given bits."""
+    if bits == 32:
+        return f'{word:032b}'
     return format(word, f'0{bits}b')
 
 def format_hex(word: int, bits: int = 32) -> str:
     """Format integer as hex string with given bits."""
+    if bits == 32:
+        return f'{word:08x}'
     return format(word, f'0{bits//4}x')
 
 def disassemble(word: int) -> Optional[str]:
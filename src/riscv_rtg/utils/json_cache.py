@@ -0,0 +1,86 @@
+"""
+JSON file cache for parsed YAML files.
+
+A cache entry records the source file's mtime_ns and size and is used only
+while both still match. The cache directory keeps at most MAX_CACHE_FILES
+entries; the least recently written ones are removed first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+# Entries kept per cache directory
+MAX_CACHE_FILES = 64
+
+
+def json_cache_file(source_file: str) -> str:
+    """Return the JSON cache path for a YAML file, in the user cache directory.
+
+    The directory is $RISCV_RTG_CACHE_DIR, else $XDG_CACHE_HOME/riscv_rtg,
+    else ~/.cache/riscv_rtg; files are named by a hash of the YAML's real path.
+    """
+    cache_dir = os.environ.get('RISCV_RTG_CACHE_DIR')
+    if not cache_dir:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(cache_home, 'riscv_rtg')
+    key = hashlib.sha1(os.path.realpath(source_file).encode()).hexdigest()
+    return os.path.join(cache_dir, key + '.json')
+
+
+def read_json_cache(cache_file: str, st: os.stat_result) -> Any:
+    """Return the cached data if it was written for a YAML with st's mtime and size, else None."""
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = json.load(f)
+        if cached['mtime_ns'] == st.st_mtime_ns and cached['size'] == st.st_size:
+            return cached['data']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # No usable cache
+    return None
+
+
+def write_json_cache(cache_file: str, st: os.stat_result, data: Any):
+    """Atomically write data as a JSON cache for a YAML with stat st.
+
+    Skipped if JSON cannot represent data exactly.
+    """
+    try:
+        text = json.dumps({'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'data': data})
+        if json.loads(text)['data'] != data:
+            return  # e.g. non-string keys would not round-trip
+        cache_dir = os.path.dirname(os.path.abspath(cache_file))
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _prune_cache_dir(cache_dir)
+    except (OSError, TypeError, ValueError):
+        pass  # Caching is best effort (read-only directory, non-JSON values)
+
+
+def _prune_cache_dir(cache_dir: str):
+    """Remove the least recently written JSON entries beyond MAX_CACHE_FILES."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.json') and entry.is_file():
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass  # Removed concurrently
+    if len(entries) <= MAX_CACHE_FILES:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - MAX_CACHE_FILES]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # Removed concurrently
@@ -4,18 +4,30 @@ Unit tests for configuration file support.
 """
 
 import unittest
+import io
 import tempfile
 import os
 import argparse
+import json
+from unittest import mock
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from riscv_rtg.generator.cli import load_config, validate_and_convert_config, merge_config_with_args
+from riscv_rtg.generator import cli
+from riscv_rtg.utils import json_cache
+from riscv_rtg.generator.cli import (load_config, validate_and_convert_config, merge_config_with_args,
+                                    load_store_ranges_arg, make_line_formatter)
 
 
 class TestConfigLoading(unittest.TestCase):
     """Test configuration loading functions."""
 
+    def setUp(self):
+        # Keep JSON caches out of the user cache dir unless a test enables them
+        patcher = mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_load_config_valid(self):
         """Test loading valid YAML configuration."""
         with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
@@ -30,6 +42,59 @@ class TestConfigLoading(unittest.TestCase):
         finally:
             os.unlink(config_path)
 
+    def test_load_config_stream(self):
+        """Test loading configuration from a text stream."""
+        config = load_config(io.StringIO('count: 10\nformat: "asm"\nseed: 42\n'))
+        self.assertEqual(config, {'count': 10, 'format': 'asm', 'seed': 42})
+        self.assertEqual(load_config(io.StringIO('')), {})
+        with self.assertRaises(ValueError):
+            load_config(io.StringIO('count: 10\ninvalid yaml\n'))
+
+    def test_load_config_cache(self):
+        """Test cached configs are returned as copies and refreshed when the file changes."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            f.write('count: 10\nweights:\n  r: 2.0\n')
+            config_path = f.name
+
+        try:
+            config = load_config(config_path)
+            config['weights']['r'] = 9.0
+            self.assertEqual(load_config(config_path)['weights']['r'], 2.0)
+
+            with open(config_path, 'w') as f:
+                f.write('count: 200\n')
+            self.assertEqual(load_config(config_path), {'count': 200})
+        finally:
+            os.unlink(config_path)
+
+    def test_load_config_json_cache(self):
+        """Test the JSON cache is written to the cache dir and used while the YAML mtime matches."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = os.path.join(tmp, 'config.yaml')
+            cache_dir = os.path.join(tmp, 'cache')
+            with open(config_path, 'w') as f:
+                f.write('count: 10\n')
+            with mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '', 'RISCV_RTG_CACHE_DIR': cache_dir}):
+                self.assertEqual(load_config(config_path), {'count': 10})
+                cache_path = json_cache.json_cache_file(config_path)
+                self.assertEqual(os.path.dirname(cache_path), cache_dir)
+                # Nothing is written next to the config
+                self.assertEqual(sorted(os.listdir(tmp)), ['cache', 'config.yaml'])
+                with open(cache_path) as f:
+                    data = json.load(f)
+                self.assertEqual(data['data'], {'count': 10})
+
+                data['data']['count'] = 20
+                with open(cache_path, 'w') as f:
+                    json.dump(data, f)
+                cli._CONFIG_CACHE.clear()
+                self.assertEqual(load_config(config_path), {'count': 20})
+
+                # A changed mtime makes the cache stale
+                os.utime(config_path, ns=(0, data['mtime_ns'] + 1))
+                cli._CONFIG_CACHE.clear()
+                self.assertEqual(load_config(config_path), {'count': 10})
+
     def test_load_config_missing_file(self):
         """Test loading missing file raises FileNotFoundError."""
         with self.assertRaises(FileNotFoundError):
@@ -125,6 +190,26 @@ class TestConfigLoading(unittest.TestCase):
         self.assertEqual(merged2.pc_comments, True)  # CLI overrides (same as config)
         self.assertEqual(merged2.list_instructions, True)  # CLI overrides
 
+    def test_load_store_ranges_arg(self):
+        """Test the --load-store-ranges argument type parses to tuples."""
+        self.assertEqual(load_store_ranges_arg('-100:200, 0x100:0x20'), [(-100, 200), (256, 32)])
+        with self.assertRaises(argparse.ArgumentTypeError):
+            load_store_ranges_arg('5')
+        with self.assertRaises(argparse.ArgumentTypeError):
+            load_store_ranges_arg('0:0')
+        # Items int(x, 0) rejects are rejected as a whole
+        for spec in ['010:1', '1:2:3', '0x:1']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                load_store_ranges_arg(spec)
+        self.assertEqual(load_store_ranges_arg(' , 1_000:0b11,'), [(1000, 3)])
+
+    def test_binary_line_formatter(self):
+        """Test binary output is the same with and without the 16-bit table."""
+        for count in (1, 5000):
+            emit = make_line_formatter('bin', count=count)
+            for word in (0, 1, 0x80000000, 0xdeadbeef, 0xffffffff):
+                self.assertEqual(emit(word, '', 0), format(word, '032b'))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the YAML JSON cache helpers.
+"""
+
+import unittest
+import tempfile
+import os
+from unittest import mock
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from riscv_rtg.utils import json_cache
+from riscv_rtg.utils.json_cache import json_cache_file, read_json_cache, write_json_cache
+
+
+class TestJsonCache(unittest.TestCase):
+    """Test the JSON cache helpers."""
+
+    def test_round_trip(self):
+        """Test a written entry is read back only while the stat matches."""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'a.yaml')
+            with open(source, 'w') as f:
+                f.write('a: 1\n')
+            with mock.patch.dict(os.environ, {'RISCV_RTG_CACHE_DIR': os.path.join(tmp, 'cache')}):
+                cache_file = json_cache_file(source)
+            st = os.stat(source)
+            write_json_cache(cache_file, st, {'a': 1})
+            self.assertEqual(read_json_cache(cache_file, st), {'a': 1})
+            os.utime(source, ns=(0, st.st_mtime_ns + 1))
+            self.assertIsNone(read_json_cache(cache_file, os.stat(source)))
+
+    def test_prune(self):
+        """Test the cache directory keeps only the most recently written entries."""
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'a.yaml')
+            with open(source, 'w') as f:
+                f.write('a: 1\n')
+            st = os.stat(source)
+            cache_dir = os.path.join(tmp, 'cache')
+            with mock.patch.object(json_cache, 'MAX_CACHE_FILES', 3):
+                for i in range(5):
+                    cache_file = os.path.join(cache_dir, f'{i}.json')
+                    write_json_cache(cache_file, st, {'a': i})
+                    os.utime(cache_file, ns=(0, i * 10 ** 9))
+            self.assertEqual(sorted(os.listdir(cache_dir)), ['2.json', '3.json', '4.json'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -5,17 +5,24 @@ Unit tests for RISC-V ISA generator.
 
 import unittest
 import random
+import struct
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 from riscv_rtg.isa.riscv_isa import RISCVISA, InstructionFormat, Registers, format_binary, format_hex
+from riscv_rtg.isa.enums import INSTRUCTION_FORMAT_TO_TYPE, RiscvInstructionType, format_to_type
 
 
 class TestRISCVISA(unittest.TestCase):
     """Test RISCVISA class."""
 
-    def setUp(self):
-        self.isa = RISCVISA()
+    @classmethod
+    def setUpClass(cls):
+        # One ISA for the class; weight changes are undone after each test
+        cls.isa = RISCVISA()
+
+    def tearDown(self):
+        self.isa.reset_weights()
 
     def test_instruction_count(self):
         """Test that instructions are loaded."""
@@ -39,6 +46,28 @@ class TestRISCVISA(unittest.TestCase):
             # Check encoded is 32-bit
             self.assertTrue(0 <= encoded < (1 << 32))
 
+    def test_generate_random_batch(self):
+        """Test batch generation respects the subset and register ranges."""
+        isa = RISCVISA(rd_min=5, rd_max=6, rs1_min=7, rs1_max=7, rs2_min=8, rs2_max=9)
+        r_type = isa.get_instructions_by_format(InstructionFormat.R)
+        results = isa.generate_random_batch(50, r_type)
+        self.assertEqual(len(results), 50)
+        for encoded, asm in results:
+            self.assertEqual(encoded & 0x7f, 0b0110011)
+            self.assertIn((encoded >> 7) & 0x1f, (5, 6))
+            self.assertEqual((encoded >> 15) & 0x1f, 7)
+            self.assertIn((encoded >> 20) & 0x1f, (8, 9))
+        self.assertEqual(len(isa.generate_random_batch(5)), 5)
+
+    def test_generate_binary(self):
+        """Test generate_binary packs the same words as generate_random."""
+        random.seed(7)
+        words = [encoded for encoded, _ in self.isa.generate_random(8)]
+        random.seed(7)
+        data = self.isa.generate_binary(8)
+        self.assertEqual(len(data), 32)
+        self.assertEqual(list(struct.unpack('<8I', data)), words)
+
     def test_instruction_formats(self):
         """Test instruction format categorization."""
         for fmt in InstructionFormat:
@@ -62,11 +91,36 @@ class TestRISCVISA(unittest.TestCase):
             reg_no_zero = Registers.random(exclude_zero=True)
             self.assertTrue(1 <= reg_no_zero <= 31)
 
+    def test_register_random_range_exclude_zero(self):
+        """Test ranged register generation never returns x0 when excluded."""
+        seen = set()
+        for _ in range(200):
+            reg = Registers.random_range(0, 3, exclude_zero=True)
+            self.assertTrue(1 <= reg <= 3)
+            seen.add(reg)
+        self.assertEqual(seen, {1, 2, 3})
+        self.assertEqual(Registers.random_range(0, 1, exclude_zero=True), 1)
+        with self.assertRaises(ValueError):
+            Registers.random_range(0, 0, exclude_zero=True)
+
+    def test_field_imm_gen(self):
+        """Test full-field immediate generators stay in range and aligned."""
+        from riscv_rtg.isa.riscv_isa import make_field_imm_gen
+        branch_imm = make_field_imm_gen(13, signed=True, align=2)
+        unsigned_imm = make_field_imm_gen(5, signed=False)
+        for _ in range(500):
+            imm = branch_imm()
+            self.assertTrue(-4096 <= imm <= 4094)
+            self.assertEqual(imm % 2, 0)
+            self.assertTrue(0 <= unsigned_imm() <= 31)
+
     def test_format_functions(self):
         """Test binary and hex formatting."""
         word = 0x12345678
         self.assertEqual(format_binary(word), format(word, '032b'))
         self.assertEqual(format_hex(word), format(word, '08x'))
+        self.assertEqual(format_binary(0x5a, 8), '01011010')
+        self.assertEqual(format_hex(0x5a, 16), '005a')
 
     def test_reproducible_generation(self):
         """Test that seed produces same results."""
@@ -75,6 +129,31 @@ class TestRISCVISA(unittest.TestCase):
         random.seed(42)
         results2 = self.isa.generate_random(5)
         self.assertEqual(results1, results2)
+        self.isa.seed(42)
+        self.assertEqual(self.isa.generate_random(5), results1)
+
+    def test_rng_instance(self):
+        """Test an ISA with its own RNG is reproducible and ignores the global seed."""
+        random.seed(1)
+        results1 = RISCVISA(rng=random.Random(42)).generate_random(20)
+        random.seed(2)
+        results2 = RISCVISA(rng=random.Random(42)).generate_random(20)
+        self.assertEqual(results1, results2)
+
+        isa = RISCVISA(rng=random.Random())
+        isa.seed(7)
+        results1 = isa.generate_random(20)
+        isa.seed(7)
+        self.assertEqual(isa.generate_random(20), results1)
+
+        # Instructions draw their random registers from the ISA's rng too
+        add = isa.get_instruction_by_name('add')
+        isa.seed(7)
+        random.seed(1)
+        results1 = [add.generate_random() for _ in range(5)]
+        isa.seed(7)
+        random.seed(2)
+        self.assertEqual([add.generate_random() for _ in range(5)], results1)
 
     def test_instruction_encoding(self):
         """Test that encoding produces valid 32-bit words."""
@@ -85,6 +164,35 @@ class TestRISCVISA(unittest.TestCase):
             # Check that opcode is in lower 7 bits
             self.assertEqual(encoded & 0x7f, instr.opcode)
 
+    def test_get_instruction_by_name(self):
+        """Test lookup of instructions by mnemonic."""
+        instr = self.isa.get_instruction_by_name("addi")
+        self.assertIsNotNone(instr)
+        self.assertEqual(instr.name, "addi")
+        self.assertIn(instr, self.isa.get_instructions_by_format(InstructionFormat.I))
+        self.assertIsNone(self.isa.get_instruction_by_name("unknown_instr"))
+
+    def test_metadata(self):
+        """Test class-level metadata matches the loaded instructions."""
+        expected = tuple((instr.name, instr.format.value, instr.opcode) for instr in self.isa.instructions)
+        self.assertEqual(RISCVISA.metadata(), expected)
+
+    def test_format_id(self):
+        """Test every instruction carries a distinct small-int id per format."""
+        ids = {}
+        for instr in self.isa.instructions:
+            ids.setdefault(instr.format, set()).add(instr.format_id)
+        self.assertTrue(all(len(v) == 1 for v in ids.values()))
+        self.assertEqual(sorted(next(iter(v)) for v in ids.values()), list(range(len(ids))))
+
+    def test_format_to_type(self):
+        """Test the format lookup table matches the format-to-type mapping."""
+        for instr in self.isa.instructions:
+            fmt = instr.format.value
+            self.assertEqual(format_to_type(fmt), INSTRUCTION_FORMAT_TO_TYPE[fmt])
+        for fmt in ['X', 'r', '0', '@']:
+            self.assertEqual(format_to_type(fmt), RiscvInstructionType.UNKNOWN)
+
     def test_weight_initialization(self):
         """Test that weights are initialized correctly."""
         # Default weights should be 1.0 for all instructions
@@ -116,38 +224,55 @@ class TestRISCVISA(unittest.TestCase):
             else:
                 self.assertEqual(self.isa.get_weight(instr.name), 1.0)
 
+    def test_batch_weight_setters(self):
+        """Test setting several weights by format and by name at once."""
+        self.isa.set_weights_by_format({InstructionFormat.R: 2.0, InstructionFormat.B: 0.5})
+        self.isa.set_weights_by_name({"ecall": 4.0, "ebreak": 0.0})
+        for instr in self.isa.instructions:
+            expected = {InstructionFormat.R: 2.0, InstructionFormat.B: 0.5}.get(instr.format, 1.0)
+            expected = {"ecall": 4.0, "ebreak": 0.0}.get(instr.name, expected)
+            self.assertEqual(self.isa.get_weight(instr.name), expected)
+
+        # Invalid entries leave all weights unchanged
+        with self.assertRaises(ValueError):
+            self.isa.set_weights_by_name({"add": 9.0, "unknown_instr": 1.0})
+        with self.assertRaises(ValueError):
+            self.isa.set_weights_by_format({InstructionFormat.I: 9.0, InstructionFormat.S: -1.0})
+        self.assertEqual(self.isa.get_weight("add"), 2.0)
+        self.assertEqual(self.isa.get_weight("addi"), 1.0)
+
     def test_weighted_selection(self):
         """Test that weighted selection respects weights."""
         # Set weight for "add" to 0, others to 1
         self.isa.set_weight_by_name("add", 0.0)
 
         # Generate many instructions, "add" should never appear
-        for _ in range(100):
-            instr = self.isa.get_random_instruction()
-            self.assertNotEqual(instr.name, "add")
+        names = {instr.name for instr in self.isa.draw_many(100)}
+        self.assertNotIn("add", names)
+        self.assertNotEqual(self.isa.get_random_instruction().name, "add")
 
     def test_weighted_selection_high_weight(self):
         """Test that high weight increases frequency."""
         # Count occurrences of "add" with normal weight
         random.seed(42)
-        normal_count = 0
-        for _ in range(100):
-            instr = self.isa.get_random_instruction()
-            if instr.name == "add":
-                normal_count += 1
+        normal_count = sum(instr.name == "add" for instr in self.isa.draw_many(100))
 
         # Reset weights and set "add" weight to 10
         self.isa.set_weight_by_name("add", 10.0)
         random.seed(42)
-        high_weight_count = 0
-        for _ in range(100):
-            instr = self.isa.get_random_instruction()
-            if instr.name == "add":
-                high_weight_count += 1
+        high_weight_count = sum(instr.name == "add" for instr in self.isa.draw_many(100))
 
         # With weight 10, "add" should appear more often
         self.assertGreater(high_weight_count, normal_count)
 
+    def test_reset_weights(self):
+        """Test reset_weights restores the default weight everywhere."""
+        self.isa.set_weight_by_format(InstructionFormat.R, 3.0)
+        self.isa.set_weight_by_name("add", 0.0)
+        self.isa.reset_weights()
+        for instr in self.isa.instructions:
+            self.assertEqual(self.isa.get_weight(instr.name), 1.0)
+
     def test_get_weighted_random_from_list(self):
         """Test weighted selection from a subset."""
         # Get only R-type instructions
@@ -161,6 +286,48 @@ class TestRISCVISA(unittest.TestCase):
             self.assertIn(instr, r_type)
             self.assertNotEqual(instr.name, "add")
 
+    def test_get_weighted_random_batch(self):
+        """Test batched weighted selection from a subset."""
+        r_type = self.isa.get_instructions_by_format(InstructionFormat.R)
+        self.isa.set_weight_by_name("add", 0.0)
+        picks = self.isa.get_weighted_random_batch(r_type, 100)
+        self.assertEqual(len(picks), 100)
+        for instr in picks:
+            self.assertIn(instr, r_type)
+            self.assertNotEqual(instr.name, "add")
+        with self.assertRaises(ValueError):
+            self.isa.get_weighted_random_batch([], 1)
+
+    def test_cumulative_weights_refresh(self):
+        """Test cached cumulative weights follow later weight changes."""
+        r_type = self.isa.get_instructions_by_format(InstructionFormat.R)
+        self.isa.get_random_instruction()
+        self.isa.get_weighted_random_from_list(r_type)
+        self.isa.set_weights_by_name({instr.name: 0.0 for instr in self.isa.instructions})
+        self.isa.set_weight_by_name('sub', 1.0)
+        self.assertEqual(self.isa.get_random_instruction().name, 'sub')
+        self.assertEqual(self.isa.get_weighted_random_from_list(r_type).name, 'sub')
+        self.isa.set_weight_by_name('sub', 0.0)
+        with self.assertRaises(ValueError):
+            self.isa.get_random_instruction()
+
+    def test_cumulative_weights_subset_changed_in_place(self):
+        """Test a subset list changed in place gets fresh cumulative weights."""
+        self.isa.set_weights_by_name({instr.name: 0.0 for instr in self.isa.instructions})
+        self.isa.set_weight_by_name('xor', 1.0)
+        subset = [self.isa.get_instruction_by_name('add'), self.isa.get_instruction_by_name('xor')]
+        self.assertEqual(self.isa.get_weighted_random_from_list(subset).name, 'xor')
+        subset.reverse()
+        self.assertEqual(self.isa.get_weighted_random_from_list(subset).name, 'xor')
+
+    def test_weights_read_only(self):
+        """Test weights can be read but only changed through set_weight*."""
+        self.assertEqual(self.isa.weights['xor'], 1.0)
+        with self.assertRaises(TypeError):
+            self.isa.weights['xor'] = 5.0
+        self.isa.set_weight_by_name('xor', 5.0)
+        self.assertEqual(self.isa.weights['xor'], 5.0)
+
 
 class TestInstructionFormats(unittest.TestCase):
     """Test instruction format encoding."""
@@ -197,6 +364,18 @@ class TestInstructionFormats(unittest.TestCase):
         expected = (0b0000010 << 25) | (3 << 20) | (2 << 15) | (0b010 << 12) | (0b00100 << 7) | 0b0100011
         self.assertEqual(encoded, expected)
 
+    def test_encode_batch(self):
+        """Test batch encoding matches per-instruction encoding."""
+        from riscv_rtg.isa.riscv_isa import encode_batch
+        isa = RISCVISA()
+        instrs = isa.instructions
+        rd = [i % 32 for i in range(len(instrs))]
+        rs1 = [(i * 7) % 32 for i in range(len(instrs))]
+        rs2 = [(i * 13) % 32 for i in range(len(instrs))]
+        imm = [(i * 37) - 512 for i in range(len(instrs))]
+        expected = [instr.encode(a, b, c, d) for instr, a, b, c, d in zip(instrs, rd, rs1, rs2, imm)]
+        self.assertEqual(encode_batch(instrs, rd, rs1, rs2, imm), expected)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -4,6 +4,7 @@ Unit tests for semantic correlation features.
 """
 
 import unittest
+import random
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -42,14 +43,31 @@ class TestSemanticState(unittest.TestCase):
         self.assertEqual(state.register_readers[7], [3])
         state.update_register_read(7, 5)
         self.assertEqual(state.register_readers[7], [3, 5])
+        # Looking up an unread register does not add it
+        self.assertEqual(state.get_readers(8), [])
+        self.assertNotIn(8, state.register_readers)
 
     def test_memory_access(self):
         """Test updating memory access."""
         state = SemanticState()
         state.update_memory_access(10, -4, 2)
-        self.assertEqual(state.memory_accesses[10], [(-4, 2)])
+        self.assertEqual(state.memory_accesses[10], ((-4, 2),))
         state.update_memory_access(10, 8, 3)
-        self.assertEqual(state.memory_accesses[10], [(-4, 2), (8, 3)])
+        self.assertEqual(state.memory_accesses[10], ((-4, 2), (8, 3)))
+        self.assertEqual(state.get_memory_access_pattern(10), [(-4, 2), (8, 3)])
+        self.assertEqual(state.get_memory_access_count(10), 2)
+        self.assertEqual(state.get_memory_access_pattern(11), [])
+        self.assertEqual(state.get_memory_access_count(11), 0)
+
+        # Reading a register with no accesses does not add it
+        self.assertNotIn(11, state.memory_accesses)
+        self.assertEqual(list(state.memory_accesses), [10])
+
+        # memory_accesses is a read-only snapshot
+        with self.assertRaises(TypeError):
+            state.memory_accesses[11] = ((0, 5),)
+        with self.assertRaises(AttributeError):
+            state.memory_accesses[10].append((12, 4))
 
     def test_loop_enter_exit(self):
         """Test loop nesting."""
@@ -89,9 +107,12 @@ class TestSemanticState(unittest.TestCase):
 class TestCommentGenerator(unittest.TestCase):
     """Test CommentGenerator class."""
 
+    @classmethod
+    def setUpClass(cls):
+        cls.isa = RISCVISA()
+
     def setUp(self):
         self.state = SemanticState()
-        self.isa = RISCVISA()
 
     def test_detail_levels(self):
         """Test comment generation with different detail levels."""
@@ -115,6 +136,20 @@ class TestCommentGenerator(unittest.TestCase):
         comment = gen.generate(self.isa.instructions[0], 1, 2, 3, 0, 0)
         self.assertIsNone(comment)
 
+    def test_comments_follow_state(self):
+        """Test repeated comments reflect state changes between calls."""
+        add = next(instr for instr in self.isa.instructions if instr.name == 'add')
+        gen = CommentGenerator(self.state, "medium")
+        self.assertEqual(gen.generate(add, 5, 1, 2, 0, 0), "reads x1; reads x2")
+        self.state.update_register_write(5, 0)
+        self.assertEqual(gen.generate(add, 5, 1, 2, 0, 1), "reg x5 written; reads x1; reads x2")
+
+        gen = CommentGenerator(self.state, "detailed")
+        self.state.update_register_read(1, 1)
+        first = gen.generate(add, 0, 1, 0, 0, 2)
+        self.state.update_register_read(1, 2)
+        self.assertNotEqual(gen.generate(add, 0, 1, 0, 0, 3), first)
+
     def test_no_semantic_state(self):
         """Test comment generator without semantic state."""
         gen = CommentGenerator(None, "medium")
@@ -125,8 +160,9 @@ class TestCommentGenerator(unittest.TestCase):
 class TestPatternGeneratorSemantic(unittest.TestCase):
     """Test PatternGenerator with semantic features."""
 
-    def setUp(self):
-        self.isa = RISCVISA()
+    @classmethod
+    def setUpClass(cls):
+        cls.isa = RISCVISA()
 
     def test_semantic_state_integration(self):
         """Test that pattern generator updates semantic state."""
@@ -140,6 +176,28 @@ class TestPatternGeneratorSemantic(unittest.TestCase):
         # The exact updates depend on generated registers
         self.assertEqual(pattern_gen.instr_idx, 2)
 
+    def test_batched_hazards(self):
+        """Test batched pair generation matches repeated single-pair calls."""
+        pattern_gen = PatternGenerator(self.isa)
+        for batch, single in [('generate_load_store_pairs', 'generate_load_store_pair'),
+                              ('generate_raw_hazards', 'generate_raw_hazard'),
+                              ('generate_war_hazards', 'generate_war_hazard'),
+                              ('generate_waw_hazards', 'generate_waw_hazard')]:
+            random.seed(7)
+            results = getattr(pattern_gen, batch)(4)
+            random.seed(7)
+            expected = [instr for _ in range(4) for instr in getattr(pattern_gen, single)()]
+            self.assertEqual(len(results), 8)
+            self.assertEqual(results, expected)
+
+    def test_rng_instance(self):
+        """Test a pattern generator with its own RNG ignores the global seed."""
+        random.seed(1)
+        results1 = PatternGenerator(self.isa, rng=random.Random(8)).generate_mixed_patterns(40)
+        random.seed(2)
+        results2 = PatternGenerator(self.isa, rng=random.Random(8)).generate_mixed_patterns(40)
+        self.assertEqual(results1, results2)
+
     def test_comment_generation(self):
         """Test that comments are generated when enabled."""
         state = SemanticState()
@@ -156,6 +214,8 @@ class TestPatternGeneratorSemantic(unittest.TestCase):
         # Should work without errors
         results = pattern_gen.generate_random_sequence(5)
         self.assertEqual(len(results), 5)
+        self.assertTrue(all('#' not in asm for _, asm in results))
+        self.assertEqual(pattern_gen.instr_idx, 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sequence pattern generation.
+"""
+
+import unittest
+import json
+import tempfile
+from unittest import mock
+import random
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from riscv_rtg.utils import json_cache
+from riscv_rtg.generator.sequence_patterns import (SequenceStep, SequencePattern, SequencePatternLoader,
+                                                  SequencePatternGenerator)
+from riscv_rtg.generator.patterns import PatternGenerator
+from riscv_rtg.isa.riscv_isa import RISCVISA
+
+PATTERNS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'src', 'riscv_rtg', 'constraints', 'sequence_patterns.yaml')
+
+
+class TestSequenceStep(unittest.TestCase):
+    """Test SequenceStep register resolution."""
+
+    def make_step(self, registers):
+        return SequenceStep({'instruction': {'names': ['add']},
+                             'constraints': {'registers': registers}}, 0)
+
+    def test_fixed_and_missing_registers(self):
+        """Test fixed register values and unconstrained fields."""
+        step = self.make_step({'rd': 5, 'rs1': {'type': 'register', 'value': 7}})
+        variables = {}
+        self.assertEqual(step.reg_resolvers['rd'](variables), 5)
+        self.assertEqual(step.reg_resolvers['rs1'](variables), 7)
+        self.assertEqual(step.reg_resolvers['rs2'](variables), 0)
+
+    def test_allowed_exclude_zero(self):
+        """Test allowed lists never yield x0 when zero is excluded."""
+        step = self.make_step({'rd': {'type': 'register', 'allowed': [0, 3], 'exclude_zero': True}})
+        for _ in range(50):
+            self.assertEqual(step.reg_resolvers['rd']({}), 3)
+
+    def test_variable_and_same_as(self):
+        """Test variable references and same_as fields."""
+        step = self.make_step({'rd': {'type': 'variable', 'name': 'v'},
+                               'rs1': {'type': 'same_as', 'field': 'rd'}})
+        variables = {'v': 12}
+        self.assertEqual(step.reg_resolvers['rd'](variables), 12)
+        self.assertEqual(step.reg_resolvers['rs1'](variables), 12)
+
+    def test_different_from(self):
+        """Test different_from excludes fixed registers and variables."""
+        step = self.make_step({'rd': {'type': 'different_from', 'allowed': [1, 2, 3],
+                                      'exclude': [1, {'type': 'variable', 'name': 'v'}]}})
+        variables = {'v': 2}
+        for _ in range(50):
+            self.assertEqual(step.reg_resolvers['rd'](variables), 3)
+
+    def test_resolve_immediate(self):
+        """Test immediate constraints and per-format defaults."""
+        isa = RISCVISA()
+        step = SequenceStep({'instruction': {'names': ['addi']},
+                             'constraints': {'immediates': {
+                                 'i_type': {'min': -10, 'max': 10, 'alignment': 4},
+                                 's_type': {'value': 8}}}}, 0)
+        for _ in range(50):
+            imm = step.resolve_immediate(isa.get_instruction_by_name('addi'), {})
+            self.assertTrue(-8 <= imm <= 8)
+            self.assertEqual(imm % 4, 0)
+        self.assertEqual(step.resolve_immediate(isa.get_instruction_by_name('sw'), {}), 8)
+        self.assertEqual(step.resolve_immediate(isa.get_instruction_by_name('add'), {}), 0)
+        self.assertEqual(step.resolve_immediate(isa.get_instruction_by_name('lui'), {}), 0)
+
+    def test_fixed_step_generate(self):
+        """Test fully fixed steps generate the same instruction and publish variables."""
+        isa = RISCVISA()
+        step = SequenceStep({'instruction': {'names': ['addi']},
+                             'constraints': {'registers': {'rd': 5, 'rs1': 6},
+                                             'immediates': {'i_type': {'value': 3}}},
+                             'variables': {'dst': {'type': 'register', 'source_field': 'rd'}}}, 0)
+        for _ in range(3):
+            context = {'variables': {}}
+            encoded, asm = step.generate(isa, None, context)
+            self.assertEqual(encoded, isa.get_instruction_by_name('addi').encode(5, 6, 0, 3))
+            self.assertEqual(asm, 'addi x5, x6, 3')
+            self.assertEqual(context['variables'], {'dst': 5})
+
+    def test_fixed_step_cache(self):
+        """Test fixed steps are cached per caller, not on the shared step."""
+        step_data = {'instruction': {'names': ['addi']},
+                     'constraints': {'registers': {'rd': 5, 'rs1': 6},
+                                     'immediates': {'i_type': {'value': 3}}}}
+        pattern = SequencePattern('fixed', {'steps': [step_data]})
+        isa = RISCVISA()
+        cache = {}
+        results = pattern.generate(isa, PatternGenerator(isa), const_cache=cache)
+        self.assertEqual(results, [(isa.get_instruction_by_name('addi').encode(5, 6, 0, 3), 'addi x5, x6, 3')])
+        self.assertEqual(list(cache), pattern.steps)
+        self.assertEqual(pattern.generate(isa, PatternGenerator(isa), const_cache=cache), results)
+        # Other callers do not see the cached entry
+        self.assertEqual(pattern.generate(RISCVISA(), None), results)
+
+
+class TestSequencePatternLoader(unittest.TestCase):
+    """Test SequencePatternLoader class."""
+
+    def setUp(self):
+        # Keep JSON caches out of the user cache dir unless a test enables them
+        patcher = mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.loader = SequencePatternLoader(PATTERNS_FILE)
+
+    def test_load_patterns(self):
+        """Test patterns are loaded from YAML."""
+        self.assertIn('load_use', self.loader.get_all_pattern_names())
+        self.assertEqual(len(self.loader.get_pattern('load_use').steps), 2)
+
+    def test_json_cache(self):
+        """Test the JSON cache is written to the cache dir, reused while fresh, and can be disabled."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'patterns.yaml')
+            cache_dir = os.path.join(tmp, 'cache')
+            with open(path, 'w') as f:
+                f.write('sequence_patterns:\n  p:\n    weight: 2.0\n'
+                        '    steps:\n      - instruction: {names: [add]}\n')
+            with mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '', 'RISCV_RTG_CACHE_DIR': cache_dir}):
+                self.assertEqual(SequencePatternLoader(path).get_pattern('p').weight, 2.0)
+                cache_path = json_cache.json_cache_file(path)
+                self.assertEqual(os.path.dirname(cache_path), cache_dir)
+                self.assertTrue(os.path.exists(cache_path))
+                # Nothing is written next to the YAML
+                self.assertEqual(sorted(os.listdir(tmp)), ['cache', 'patterns.yaml'])
+
+                # A fresh cache is used instead of the YAML
+                with open(cache_path) as f:
+                    data = json.load(f)
+                data['data']['sequence_patterns']['p']['weight'] = 5.0
+                with open(cache_path, 'w') as f:
+                    json.dump(data, f)
+                self.assertEqual(SequencePatternLoader(path).get_pattern('p').weight, 5.0)
+
+                # A different size or mtime makes the cache stale
+                os.utime(path, ns=(0, data['mtime_ns'] + 1))
+                self.assertEqual(SequencePatternLoader(path).get_pattern('p').weight, 2.0)
+
+            with mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '1'}):
+                self.assertEqual(SequencePatternLoader(path).get_pattern('p').weight, 2.0)
+
+    def test_get_patterns_by_length(self):
+        """Test length filtering returns exactly the patterns that fit."""
+        for max_length in range(0, 8):
+            expected = {name for name, p in self.loader.patterns.items() if len(p.steps) <= max_length}
+            found = self.loader.get_patterns_by_length(max_length)
+            self.assertEqual({p.name for p in found}, expected)
+            self.assertEqual(len(found), len(expected))
+
+    def test_select_pattern_respects_slots(self):
+        """Test selected patterns always fit in the available slots."""
+        min_steps = min(len(p.steps) for p in self.loader.patterns.values())
+        self.assertIsNone(self.loader.select_pattern(min_steps - 1))
+        for slots in range(min_steps, 8):
+            for _ in range(20):
+                pattern = self.loader.select_pattern(slots)
+                self.assertLessEqual(len(pattern.steps), slots)
+
+    def test_select_pattern_zero_weight(self):
+        """Test zero-weight patterns are never selected."""
+        for name, pattern in self.loader.patterns.items():
+            if name != 'load_use':
+                pattern.weight = 0.0
+        for _ in range(50):
+            self.assertEqual(self.loader.select_pattern(10).name, 'load_use')
+
+    def test_select_pattern_custom_weights(self):
+        """Test custom weights override pattern weights."""
+        weights = {name: 0.0 for name in self.loader.get_all_pattern_names()}
+        weights['compute_store'] = 1.0
+        for _ in range(50):
+            pattern = self.loader.select_pattern(10, weights=weights)
+            self.assertEqual(pattern.name, 'compute_store')
+
+
+class TestSequencePatternGenerator(unittest.TestCase):
+    """Test SequencePatternGenerator class."""
+
+    def setUp(self):
+        # Keep JSON caches out of the user cache dir unless a test enables them
+        patcher = mock.patch.dict(os.environ, {'RISCV_RTG_NO_CACHE': '1'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.isa = RISCVISA()
+        self.loader = SequencePatternLoader(PATTERNS_FILE)
+        self.gen = SequencePatternGenerator(self.isa, self.loader)
+
+    def test_generate_sequence_count(self):
+        """Test generate_sequence returns exactly count instructions."""
+        for count in [1, 2, 7, 50]:
+            results = self.gen.generate_sequence(count, pattern_density=0.8)
+            self.assertEqual(len(results), count)
+            for encoded, asm in results:
+                self.assertTrue(0 <= encoded < (1 << 32))
+                self.assertIsInstance(asm, str)
+
+    def test_generate_sequence_pattern_names(self):
+        """Test a pattern-name set restricts patterns independently of name order."""
+        random.seed(11)
+        results1 = self.gen.generate_sequence(30, frozenset(['load_use', 'compute_store']), 1.0)
+        random.seed(11)
+        results2 = self.gen.generate_sequence(30, ['compute_store', 'load_use'], 1.0)
+        self.assertEqual(results1, results2)
+        opcodes = {asm.split()[0] for _, asm in results1}
+        self.assertTrue(opcodes & {'lb', 'lh', 'lw', 'lbu', 'lhu'})
+
+    def test_generate_sequence_zero_step_pattern(self):
+        """Test a pattern without steps is skipped instead of stalling the schedule."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'patterns.yaml')
+            with open(path, 'w') as f:
+                f.write('sequence_patterns:\n  empty:\n    steps: []\n')
+            gen = SequencePatternGenerator(self.isa, SequencePatternLoader(path))
+            random.seed(4)
+            results = gen.generate_sequence(20, pattern_density=0.5)
+        self.assertEqual(len(results), 20)
+
+    def test_generate_random_batch(self):
+        """Test batch random generation respects instruction weights."""
+        for instr in self.isa.instructions:
+            self.isa.set_weight_by_name(instr.name, 0.0)
+        self.isa.set_weight_by_name('xor', 1.0)
+        results = self.gen.generate_random_batch(20)
+        self.assertEqual(len(results), 20)
+        for encoded, asm in results:
+            self.assertTrue(asm.startswith('xor '))
+        self.assertEqual(len(self.gen.generate_sequence(10, pattern_density=0.0)), 10)
+
+    def test_generate_sequence_reproducible(self):
+        """Test that seed produces same sequence."""
+        random.seed(123)
+        results1 = self.gen.generate_sequence(40, pattern_density=0.7)
+        random.seed(123)
+        results2 = self.gen.generate_sequence(40, pattern_density=0.7)
+        self.assertEqual(results1, results2)
+
+    def test_pattern_generate_reproducible(self):
+        """Test seeding the RNG makes direct pattern generation repeatable."""
+        for name in self.loader.get_all_pattern_names():
+            pattern = self.loader.get_pattern(name)
+            random.seed(3)
+            results1 = pattern.generate(self.isa, self.gen.pattern_gen)
+            random.seed(3)
+            self.assertEqual(pattern.generate(self.isa, self.gen.pattern_gen), results1, name)
+
+    def test_generator_seed(self):
+        """Test the seed argument makes new generators reproducible."""
+        results1 = SequencePatternGenerator(self.isa, self.loader, seed=5).generate_sequence(30, pattern_density=0.7)
+        results2 = SequencePatternGenerator(self.isa, self.loader, seed=5).generate_sequence(30, pattern_density=0.7)
+        self.assertEqual(results1, results2)
+
+        # Seeded generators use their own RNG and leave the global one alone
+        random.seed(1)
+        state = random.getstate()
+        gen = SequencePatternGenerator(self.isa, self.loader, seed=5)
+        self.assertEqual(random.getstate(), state)
+        random.seed(2)
+        self.assertEqual(gen.generate_sequence(30, pattern_density=0.7), results1)
+
+        # An external pattern generator keeps its own RNG, so seed is rejected
+        with self.assertRaises(ValueError):
+            SequencePatternGenerator(self.isa, self.loader, PatternGenerator(self.isa), seed=5)
+
+    def test_generate_sequence_parallel(self):
+        """Test parallel generation returns count instructions reproducibly."""
+        results1 = self.gen.generate_sequence_parallel(25, pattern_density=0.7, workers=2, seed=9)
+        results2 = self.gen.generate_sequence_parallel(25, pattern_density=0.7, workers=2, seed=9)
+        self.assertEqual(len(results1), 25)
+        self.assertEqual(results1, results2)
+
+        # Patterns added in code reach the workers
+        loader = SequencePatternLoader()
+        loader.patterns['mul_pair'] = SequencePattern('mul_pair', {'steps': [
+            {'instruction': {'names': ['mulhsu']},
+             'constraints': {'registers': {'rd': 5, 'rs1': 6, 'rs2': 7}}},
+            {'instruction': {'names': ['mulhsu']},
+             'constraints': {'registers': {'rd': {'type': 'same_as', 'field': 'rs1'},
+                                           'rs1': {'type': 'register', 'allowed': [8, 9]}}}},
+        ]})
+        gen = SequencePatternGenerator(self.isa, loader)
+        results = gen.generate_sequence_parallel(20, pattern_density=1.0, workers=2, seed=9)
+        self.assertEqual(len(results), 20)
+        self.assertIn('mulhsu x5, x6, x7', [asm for _, asm in results])
+
+    def test_generate_specific_pattern(self):
+        """Test generating a named pattern."""
+        results = self.gen.generate_specific_pattern('load_use')
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0][1].split()[0] in ['lb', 'lh', 'lw', 'lbu', 'lhu'])
+        with self.assertRaises(ValueError):
+            self.gen.generate_specific_pattern('no_such_pattern')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)